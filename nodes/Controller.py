@@ -1,7 +1,9 @@
 import udi_interface
+import logging
+import time
 
 from .GoveeDevice import GoveeDevice
-from utilities import GoveeClient
+from utilities import GoveeClient, DeviceRegistry, DeviceCache, NodeProvisioner, TimerWheel, FanoutSender, FrameStreamer, LocalControlServer, CommandDispatcher, CommandCoalescer, StatusPoller, LivenessTracker, DriverShadow, ReliableDelivery, METRICS, PACKETS, TRACE, govee_codec, netif, packet_decoder
 from utilities.timed_govee_listener import TimedGoveeListener
 
 LOGGER = udi_interface.LOGGER
@@ -21,16 +23,50 @@ class Controller(udi_interface.Node):
         self.Notices = Custom(polyglot, 'notices')
         self.TypedParameters = Custom(polyglot, 'customtypedparams')
         self.TypedData = Custom(polyglot, 'customtypeddata')
+        self.Data = Custom(polyglot, 'customdata')
 
         self.client = GoveeClient(reuse_socket=True)
-        self.listener = None
+        self.fanout = FanoutSender()
+        self.stream = FrameStreamer(fps=30)
+        self.wheel = TimerWheel(tick=0.025)
+        self.listener = TimedGoveeListener(callback=self.processDevice, wheel=self.wheel, decoder=packet_decoder.decode)
+        self.dispatcher = CommandDispatcher(workers=4, wheel=self.wheel)
+        self.outbound = CommandCoalescer(self._sendCommand, self.wheel, window=0.05)
+        self.reliable = ReliableDelivery(self._sendNow, self.wheel, dispatch=self.dispatcher.submit, allow=lambda ip: self.liveness.allow(ip))
+        self.reliableMode = False
+        self.poller = StatusPoller(self._sendNow, self.wheel, on_miss=self._pollMissed)
+        self.liveness = LivenessTracker(self._sendQueued, self.wheel, on_change=self._livenessChanged)
+        self.shadow = DriverShadow(self.wheel)
+        self.registry = DeviceRegistry()
+        self.provisioner = NodeProvisioner(self._queueProvision, self.wheel)
+        self.interfaces = []
+        self.localControl = None
+        self.sweepHosts = []
+        self.cache = DeviceCache(self.Data, self.wheel)
+        self._warmStarted = False
+
+        METRICS.register('devices', lambda: {'nodes': len(self.registry)})
+        METRICS.register('provisioning', self.provisioner.stats)
+        METRICS.register('listener', self.listener.listener.stats)
+        METRICS.register('outbound', self.outbound.stats)
+        METRICS.register('dispatch', self.dispatcher.stats)
+        METRICS.register('poller', self.poller.stats)
+        METRICS.register('liveness', self.liveness.stats)
+        METRICS.register('drivers', self.shadow.stats)
+        METRICS.register('packet_log', PACKETS.stats)
+        METRICS.register('trace', TRACE.stats)
+        METRICS.register('stream', self.stream.stats)
+        METRICS.register('reliable', lambda: dict(self.reliable.stats(), latency=self.reliable.latency()))
 
         self.poly.subscribe(self.poly.START, self.start, address)
+        self.poly.subscribe(self.poly.STOP, self.stop)
         self.poly.subscribe(self.poly.LOGLEVEL, self.handleLevelChange)
         self.poly.subscribe(self.poly.CUSTOMPARAMS, self.parameterHandler)
         self.poly.subscribe(self.poly.CUSTOMTYPEDPARAMS, self.typedParameterHandler)
         self.poly.subscribe(self.poly.CUSTOMTYPEDDATA, self.typedDataHandler)
+        self.poly.subscribe(self.poly.CUSTOMDATA, self.dataHandler)
         self.poly.subscribe(self.poly.POLL, self.poll)
+        self.poly.subscribe(self.poly.DELNODEDONE, self.nodeDeleted)
 
         self.discovery = None
 
@@ -46,98 +82,277 @@ class Controller(udi_interface.Node):
 
         self.heartbeat(0)
 
+        self.wheel.start()
+        self.dispatcher.start()
+        self.listener.start()
+        self.poller.start()
+        self.liveness.start()
+
         self.scanForDevices()
 
 
     def queryDevices(self, command=None):
         """Query Govee devices on the network (short poll)"""
-        timeout = 5
-        if self.listener and hasattr(self.listener, 'is_active') and self.listener.is_active:
-            self.listener.extend(timeout)
-        else:
-            self.listener = TimedGoveeListener(timeout=timeout, callback=self.processDevice)
-            self.listener.start()
+        self.listener.open(5)
         try:
-            self.client.send_multicast({
-                "msg": {
-                    "cmd": "devStatus",
-                    "data": {}
-                }
-            }, multicast_group='239.255.255.250', port=4001, ttl=2)
+            self.client.send_multicast(govee_codec.DEV_STATUS, multicast_group='239.255.255.250', port=4001, ttl=2, interfaces=self.interfaces)
         except Exception as e:
             LOGGER.debug(f"Failed to send discovery packet: {e}")
 
 
     def scanForDevices(self, command=None):
         """Discover Govee devices on the network (long poll)"""
-        timeout = 10
-        if self.listener and hasattr(self.listener, 'is_active') and self.listener.is_active:
-            self.listener.extend(timeout)
-        else:
-            self.listener = TimedGoveeListener(timeout=timeout, callback=self.processDevice)
-            self.listener.start()
+        self.listener.open(10, on_close=self.provisioner.flush)
         try:
-            self.client.send_multicast({
-                "msg": {
-                    "cmd": "scan",
-                    "data": {"account_topic": "reserve"}
-                }
-            }, multicast_group='239.255.255.250', port=4001, ttl=2)
+            self.client.send_multicast(govee_codec.SCAN, multicast_group='239.255.255.250', port=4001, ttl=2, interfaces=self.interfaces)
         except Exception as e:
             LOGGER.debug(f"Failed to send discovery packet: {e}")
+        if self.sweepHosts:
+            """Unicast scan for subnets where multicast does not get through"""
+            result = self.fanout.send(govee_codec.SCAN, {ip: ip for ip in self.sweepHosts}, port=4001, trace=False)
+            LOGGER.debug(f"Subnet sweep to {len(self.sweepHosts)} addresses: {result}")
 
 
     def processDevice(self, response, address):   
-        """Callback to handle discovered devices"""
-        LOGGER.debug(f"Found device at {address[0]}: {response}")
+        """Callback to handle discovered devices; `response` is a
+        packet_decoder record (ScanReply, StatusReply or OtherReply)"""
+        # One sampling decision per packet, shared by every line logged for it
+        logged = PACKETS.sampled(address[0])
+        PACKETS.debug(address[0], "Found device at %s: %s", address[0], response, sampled=logged)
         
-        msg = response.get('msg', {})
-        cmd = msg.get('cmd', '')
-        data = msg.get('data', {})
+        cmd = response.cmd
+        if METRICS.enabled:
+            METRICS.inc('packets_received', cmd or 'unknown')
+        self.liveness.seen(address[0])
+        self.dispatcher.resolve(address[0], response)
 
         if(cmd == 'scan'):
-            device_id = data.get('device', 'unknown').replace(':', '').lower()
+            device_id = DeviceRegistry.normalize_id(response.device)
             child_address = device_id[:14]
+            ip = response.ip or address[0]
 
-            if self.poly.getNode(child_address):
-                """Update device info if it already exists"""
+            node = self._registeredNode(self.registry.get_by_id(device_id))
+            if node is None and self.poly.getNode(child_address):
+                """Node exists in Polyglot but has not been indexed yet"""
                 node = self.poly.getNode(child_address)
-                node.ipAddress = data.get('ip', 'unknown')
-                node.sku = data.get('sku', 'unknown')
-                LOGGER.info(f"Updated existing device with address: {child_address}")
+                self.registry.add(node)
+
+            if node is not None:
+                """Update device info if it already exists"""
+                old_ip = node.ipAddress
+                if self.registry.update_ip(node, ip):
+                    LOGGER.info(f"Device {child_address} moved to {ip}")
+                    if self.registry.get_by_ip(old_ip) is None:
+                        self.poller.move(old_ip, ip)
+                        self.liveness.move(old_ip, ip)
+                    else:
+                        # Another light took over the old address (e.g. two
+                        # lights swapped DHCP leases); keep polling both IPs
+                        self.poller.add(ip)
+                        self.liveness.add(ip)
+                    self.liveness.seen(ip)
+                node.sku = response.sku
+                self.cache.update(node)
+                PACKETS.debug(ip, "Updated existing device with address: %s", child_address, sampled=logged)
                 return
 
-            LOGGER.info(f"Adding device with address: {child_address}, primary: {self.address}")
-
-            device = GoveeDevice(
-                self.poly, 
-                self.address,  # primary (controller address)
-                child_address,  # valid child address (MAC without colons)
-                data.get('device', 'unknown'),  # name
-                data.get('device', 'unknown'),
-                data.get('ip', 'unknown'),
-                data.get('sku', 'unknown'),
-                send_fn=self.send_request_to_device,
-            )
-            self.poly.addNode(device)
+            if not self.provisioner.is_staged(child_address):
+                LOGGER.info(f"Adding device with address: {child_address}, primary: {self.address}")
+            self.provisioner.stage(child_address, deviceId=response.device, ip=ip, sku=response.sku)
         elif(cmd == 'devStatus'):
-            nodes = self.poly.getNodes()
-
-            for node_address, node in nodes.items():
-                if hasattr(node, 'ipAddress') and node.ipAddress == address[0]:
-                    LOGGER.debug(f"Updating status for device at {address[0]}: {data}")
-                    node.setDriver('ST', data.get('onOff', 0))
-                    node.setDriver('GV0', data.get('brightness', 0))
-                    node.setDriver('GV1', data.get('colorTemInKelvin', 0))
-                    return
+            node = self._registeredNode(self.registry.get_by_ip(address[0]))
+            if node is None:
+                PACKETS.debug(address[0], "Status from unknown device at %s", address[0], sampled=logged)
+                return
+
+            PACKETS.debug(address[0], "Updating status for device at %s: %s", address[0], response, sampled=logged)
+            if METRICS.enabled:
+                METRICS.reply_received(address[0])
+            st = response.onOff or 0
+            gv0 = response.brightness or 0
+            gv1 = response.colorTemInKelvin or 0
+            self.shadow.stage(node, {'ST': st, 'GV0': gv0, 'GV1': gv1})
+            self.cache.update(node, st=st, gv0=gv0, gv1=gv1)
+            self.poller.note_reply(address[0], (st, gv0, gv1))
+            if self.reliableMode:
+                self.reliable.on_status(address[0], response.as_dict())
         else:
-            LOGGER.debug(f"Unknown command in response: {cmd}")
+            PACKETS.debug(address[0], "Unknown command in response: %s", cmd, sampled=logged)
+
+
+    def _addDevice(self, address, deviceId, ip, sku, name=None):
+        """Create a device node, add it to Polyglot and index it"""
+        device = GoveeDevice(
+            self.poly, 
+            self.address,  # primary (controller address)
+            address,  # valid child address (MAC without colons)
+            name or deviceId,  # name
+            deviceId,
+            ip,
+            sku,
+            send_fn=self.send_request_to_device,
+        )
+        self.poly.addNode(device)
+        self.registry.add(device)
+        self.poller.add(ip)
+        self.liveness.add(ip)
+        return device
+
+
+    def _queueProvision(self, batch):
+        """Create staged devices on a dispatcher worker, off the listener
+        thread; inline if the dispatch queue is full rather than lose them"""
+        if not self.dispatcher.submit('provision', self._provision, batch):
+            LOGGER.warning(f"Dispatch queue full; provisioning {len(batch)} devices inline")
+            self._provision(batch)
+
+
+    def _provision(self, batch):
+        started = time.perf_counter()
+        added = 0
+        for entry in batch:
+            if self.registry.get_by_address(entry['address']):
+                continue
+            device = self._addDevice(entry['address'], entry['deviceId'], entry['ip'], entry['sku'])
+            self.cache.update(device)
+            added += 1
+        LOGGER.info(f"Provisioned {added} devices in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+
+    def warmStart(self):
+        """Re-create device nodes from the persisted cache so they can be
+        controlled before the startup scan answers; the scan then corrects
+        any entry whose IP has changed"""
+        entries = self.cache.load()
+        for entry in entries:
+            if self.registry.get_by_address(entry.address):
+                continue
+            device = self._addDevice(entry.address, entry.deviceId, entry.ipAddress, entry.sku, entry.name)
+            self.shadow.stage(device, {'ST': entry.st, 'GV0': entry.gv0, 'GV1': entry.gv1})
+        LOGGER.info(f"Warm start restored {len(entries)} devices from cache")
+
+
+    def _registeredNode(self, node):
+        """Forget devices whose node was deleted from Polyglot"""
+        if node is None:
+            return None
+        if self.poly.getNode(node.address) is None:
+            self._forgetDevice(node.address)
+            return None
+        return node
+
+
+    def _pollMissed(self, ip):
+        self.liveness.failed(ip)
+
+
+    def _livenessChanged(self, ip, alive):
+        """Publish GV2 and take dead devices out of the poll schedule; the
+        liveness probes keep checking them until they answer again"""
+        if alive:
+            self.poller.add(ip)
+        else:
+            self.poller.remove(ip)
+        node = self.registry.get_by_ip(ip)
+        if node is not None:
+            self.shadow.stage(node, {'GV2': 1 if alive else 0})
+
+
+    def removeDevice(self, address):
+        """Delete a device node and everything tracked for it"""
+        self._forgetDevice(address)
+        self.poly.delNode(address)
+
+
+    def nodeDeleted(self, data):
+        """A node was deleted in Polyglot: stop polling it and drop it from
+        the cache so warm start does not bring it back"""
+        address = (data or {}).get('address')
+        if address and address != self.address:
+            self._forgetDevice(address)
+
+
+    def _forgetDevice(self, address):
+        node = self.registry.remove(address)
+        if node is not None:
+            self.poller.remove(node.ipAddress)
+            self.liveness.remove(node.ipAddress)
+            LOGGER.info(f"Removed device {address} ({node.ipAddress})")
+        self.shadow.forget(address)
+        self.cache.remove(address)
 
 
     def parameterHandler(self, params):
         self.Parameters.load(params)
         LOGGER.debug('Loading parameters now')
 
+        try:
+            self.outbound.window = max(0, int(self.Parameters.get('coalesceMs') or 50)) / 1000
+        except ValueError:
+            LOGGER.error(f"Invalid coalesceMs: {self.Parameters.get('coalesceMs')}")
+
+        self.reliableMode = str(self.Parameters.get('reliable') or '').lower() in ('1', 'true', 'yes', 'on')
+        try:
+            self.reliable.max_retries = int(self.Parameters.get('reliableRetries') or 3)
+        except ValueError:
+            LOGGER.error(f"Invalid reliableRetries: {self.Parameters.get('reliableRetries')}")
+
+        self.interfaces = netif.parse_interfaces(self.Parameters.get('interfaces'))
+        self.listener.listener.set_interfaces(self.interfaces)
+        self.sweepHosts = netif.subnet_hosts(self.Parameters.get('scanSubnets'))
+
+        controlPort = self.Parameters.get('controlPort')
+        try:
+            port = int(controlPort) if controlPort else None
+            if port is not None and not 1 <= port <= 65535:
+                raise ValueError(controlPort)
+            self._configureLocalControl(port)
+        except ValueError:
+            LOGGER.error(f"Invalid controlPort: {controlPort} (expected 1-65535)")
+
+        METRICS.enabled = str(self.Parameters.get('metrics') or 'true').lower() not in ('0', 'false', 'no', 'off')
+
+        try:
+            self.stream.fps = float(self.Parameters.get('streamFps') or 30)
+        except ValueError:
+            LOGGER.error(f"Invalid streamFps: {self.Parameters.get('streamFps')}")
+
+        for param, key in (('logSample', 'sample'), ('logRate', 'rate'), ('packetHistory', 'history')):
+            value = self.Parameters.get(param)
+            if not value:
+                continue
+            try:
+                PACKETS.configure(**{key: max(0, float(value)) if key == 'rate' else max(0, int(value))})
+            except ValueError:
+                LOGGER.error(f"Invalid {param}: {value}")
+
+        traceFile = (self.Parameters.get('traceFile') or '').strip()
+        if traceFile:
+            try:
+                TRACE.start(traceFile)
+            except OSError as e:
+                LOGGER.error(f"Cannot write packet trace to {traceFile}: {e}")
+        else:
+            TRACE.stop()
+
+        for param, attr in (('deadAfter', 'dead_after'), ('probeInterval', 'probe_interval')):
+            value = self.Parameters.get(param)
+            if not value:
+                continue
+            try:
+                setattr(self.liveness, attr, max(1.0, float(value)))
+            except ValueError:
+                LOGGER.error(f"Invalid {param}: {value}")
+
+        for param, attr in (('pollMaxRate', 'max_rate'), ('pollMinInterval', 'min_interval'), ('pollMaxInterval', 'max_interval')):
+            value = self.Parameters.get(param)
+            if not value:
+                continue
+            try:
+                setattr(self.poller, attr, max(0.1, float(value)))
+            except ValueError:
+                LOGGER.error(f"Invalid {param}: {value}")
+
 
     def typedParameterHandler(self, params):
         self.TypedParameters.load(params)
@@ -151,6 +366,18 @@ class Controller(udi_interface.Node):
         LOGGER.debug(params)
 
 
+    def dataHandler(self, data):
+        self.Data.load(data)
+        LOGGER.debug('Loading custom data now')
+        if 'metrics' in self.Data:
+            # Left by older versions of Dump Metrics; drop it so device cache
+            # saves stop re-sending it
+            self.Data.delete('metrics')
+        if not self._warmStarted:
+            self._warmStarted = True
+            self.warmStart()
+
+
     def handleLevelChange(self, level):
         LOGGER.info('New log level: {}'.format(level))
 
@@ -160,9 +387,38 @@ class Controller(udi_interface.Node):
             LOGGER.debug('longPoll (controller)')
             self.heartbeat()
             self.scanForDevices()
+            self.cache.checkpoint()
         else:
             LOGGER.debug('shortPoll (controller)')
-            self.queryDevices()
+            # Device nodes do not subscribe to POLL; per-device work (status
+            # polls, liveness probes) runs from the controller's heap-scheduled
+            # poller and only touches devices that are due
+            self.publishMetrics()
+
+
+    def publishMetrics(self):
+        """Report headline counters on the controller node"""
+        self.setDriver('GV2', len(self.registry))
+        if not METRICS.enabled:
+            return
+        self.setDriver('GV3', METRICS.total('packets_sent'))
+        self.setDriver('GV4', METRICS.total('packets_received'))
+        self.setDriver('GV5', METRICS.total('send_errors'))
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            LOGGER.debug(f"Metrics: {METRICS.dump()}")
+
+
+    def dumpMetrics(self, command=None):
+        """Write a full metrics snapshot to the log. It is not stored in
+        custom data, which every device cache save sends back to Polyglot"""
+        LOGGER.info(f"Metrics: {METRICS.dump()}")
+        self.publishMetrics()
+
+
+    def dumpPackets(self, command=None):
+        """Write the recent packet history of every device to the log"""
+        lines = PACKETS.dump()
+        LOGGER.info(f"Dumped {lines} buffered packets")
 
 
     # TODO: On query, request device updates
@@ -186,26 +442,188 @@ class Controller(udi_interface.Node):
 
     def stop(self):
         LOGGER.debug('NodeServer stopped.')
+        self.poller.stop()
+        self.liveness.stop()
+        self.outbound.flush_all()
+        self.dispatcher.stop()
         try:
             self.client.close()
         except Exception:
             pass
-        # Stop listener if running
-        if self.listener:
-            try:
-                self.listener.stop()
-            except Exception:
-                pass
-            self.listener = None
+        self.cache.save()
+        self.fanout.close()
+        self.stream.stop()
+        self._configureLocalControl(None)
+        try:
+            self.listener.stop()
+        except Exception:
+            pass
+        TRACE.stop()
+        self.wheel.stop()
+
+    def send_request_to_device(self, ip, payload, port=None, expect_response=False, kind=None, expect=None):
+        """Send a command to a device. Commands tagged with a `kind` go through
+        the coalescing queue so slider bursts collapse to the latest value;
+        `expect` is the devStatus state used to confirm it in reliable mode.
+        Nothing is sent while the device's circuit breaker is open.
+
+        Never blocks: the send runs on the dispatcher's workers. With
+        `expect_response` a Future is returned that resolves to the device's
+        next reply (via the shared listener) or None on timeout."""
+        if not self.liveness.allow(ip):
+            PACKETS.debug(ip, "Device at %s is unreachable; command not sent", ip)
+            return None
+        if kind is not None and not expect_response and port is None:
+            self.outbound.submit(ip, kind, payload, expect)
+            self.poller.note_command(ip)
+            return None
+        if expect_response:
+            return self.dispatcher.request(ip, self._sendNow, ip, payload, port)
+        if not self.dispatcher.submit(ip, self._sendNow, ip, payload, port):
+            LOGGER.warning(f"Dispatch queue full; dropped request to {ip}")
+        return None
+
+
+    def _sendCommand(self, ip, payload, expect=None):
+        if not self.dispatcher.submit(ip, self._transmit, ip, payload, expect):
+            LOGGER.warning(f"Dispatch queue full; dropped command to {ip}")
+
+
+    def _transmit(self, ip, payload, expect=None):
+        self._sendNow(ip, payload)
+        if self.reliableMode and expect:
+            self.reliable.track(ip, payload, expect)
 
-    def send_request_to_device(self, ip, payload, port=None, expect_response=False):
+
+    def _sendQueued(self, ip, payload):
+        """Send from a timer (liveness probes) through the device's dispatch
+        queue. No breaker check: probes are how an open breaker closes"""
+        if not self.dispatcher.submit(ip, self._sendNow, ip, payload):
+            LOGGER.warning(f"Dispatch queue full; dropped probe to {ip}")
+
+
+    def _sendNow(self, ip, payload, port=None, expect_response=False):
         try:
             return self.client.send_request(ip, payload, port=port, expect_response=expect_response)
         except Exception as e:
-            LOGGER.debug(f"Error sending request to {ip}: {e}")
+            PACKETS.debug(ip, "Error sending request to %s: %s", ip, e)
+            self.liveness.failed(ip)
             return None
 
 
+    LOCAL_COMMANDS = {'on': 'DON', 'off': 'DOF', 'bri': 'SET_BRI', 'ct': 'SET_CLITEMP'}
+    LOCAL_KINDS = {'on': 'turn', 'off': 'turn', 'bri': 'brightness', 'ct': 'colortemp', 'color': 'color'}
+    STATE_DRIVERS = {'onOff': 'ST', 'brightness': 'GV0', 'colorTemInKelvin': 'GV1'}
+
+    def _resolveTarget(self, target):
+        """Find a device node by node address, Govee device id or IP"""
+        return (self.registry.get_by_address(target.lower())
+                or self.registry.get_by_id(DeviceRegistry.normalize_id(target))
+                or self.registry.get_by_ip(target))
+
+
+    def handleLocalCommands(self, commands):
+        """Apply (target, command, args) tuples from the local control endpoint.
+
+        Commands skip the coalescing window but still pass through the
+        outbound queue, so a pending ISY command of the same kind is dropped
+        rather than sent after them. The expected state is staged on the
+        node's drivers, so ISY catches up asynchronously; the status poller
+        then confirms it. Returns
+        (target, reason) for every command that was not sent.
+        """
+        failures = []
+        for target, command, args in commands:
+            node = self._resolveTarget(target)
+            if node is None or not node.ipAddress:
+                failures.append((target, 'unknown device'))
+                continue
+            ip = node.ipAddress
+            if not self.liveness.allow(ip):
+                failures.append((target, 'unreachable'))
+                continue
+            if command == 'color':
+                payload = govee_codec.colorwc(*args)
+                expect = None
+            else:
+                cmd = self.LOCAL_COMMANDS[command]
+                value = args[0] if args else None
+                payload = GoveeDevice.buildPayload(cmd, value)
+                expect = GoveeDevice.expectedState(cmd, value)
+            self.outbound.submit(ip, self.LOCAL_KINDS[command], payload, expect, immediate=True)
+            self.poller.note_command(ip)
+            if expect:
+                self.shadow.stage(node, {self.STATE_DRIVERS[field]: value for field, value in expect.items()})
+        return failures
+
+
+    def _configureLocalControl(self, port):
+        """Start, move or stop the local control endpoint to match `port` (None disables)"""
+        if self.localControl is not None and self.localControl.port == port:
+            return
+        if self.localControl is not None:
+            self.localControl.stop()
+            self.localControl = None
+        if port is None:
+            return
+        server = LocalControlServer(self.handleLocalCommands, port=port)
+        try:
+            server.start()
+        except (OSError, OverflowError, ValueError) as e:
+            LOGGER.error(f"Could not start local control on port {port}: {e}")
+            return
+        self.localControl = server
+        METRICS.register('local_control', server.stats)
+
+
+    def send_group_command(self, nodes, cmd, value=None):
+        """Send one command (DON, DOF, SET_BRI, SET_CLITEMP) to many device nodes at once.
+
+        Returns a FanoutResult keyed by node address; devices without a known
+        IP, or that are currently unreachable, are reported as failed without
+        being sent.
+        """
+        payload = GoveeDevice.buildPayload(cmd, value)
+        targets = {}
+        skipped = {}
+        for node in nodes:
+            ip = getattr(node, 'ipAddress', None)
+            if not ip:
+                skipped[node.address] = ValueError('No IP address known')
+            elif not self.liveness.allow(ip):
+                skipped[node.address] = ConnectionError('Device unreachable')
+            else:
+                targets[node.address] = ip
+
+        result = self.fanout.send(payload, targets)
+        result.completed.update(skipped)
+        LOGGER.info(f"Group {cmd} to {len(targets)} devices in {result.elapsed * 1000:.2f}ms, {len(result.failed)} failed")
+        return result
+
+
+    def streamFrames(self, frames):
+        """Queue the next effect frame for many device nodes at once.
+
+        `frames` maps node address to an (r, g, b) tuple or a list of
+        per-segment tuples. Frames go out on the next tick of the stream;
+        unknown addresses and unreachable lights are skipped.
+        """
+        targets = {}
+        for address, frame in frames.items():
+            node = self.registry.get_by_address(address)
+            if node is not None and node.ipAddress and self.liveness.allow(node.ipAddress):
+                targets[node.ipAddress] = frame
+        if not self.stream.running:
+            self.stream.start()
+        self.stream.submit(targets)
+        return len(targets)
+
+
+    def stopStream(self):
+        """Stop streaming and return segment-mode lights to normal control"""
+        self.stream.stop()
+
+
     def heartbeat(self,init=False):
         LOGGER.debug('heartbeat: init={}'.format(init))
         if init is not False:
@@ -222,7 +640,13 @@ class Controller(udi_interface.Node):
     commands = {
         'QUERY': query,
         'DISCOVER': discover,
+        'DUMP_METRICS': dumpMetrics,
+        'DUMP_PACKETS': dumpPackets,
     }
     drivers = [
         {'driver': 'ST', 'value': 1, 'uom': 2},
+        {'driver': 'GV2', 'value': 0, 'uom': 56},    # Devices
+        {'driver': 'GV3', 'value': 0, 'uom': 56},    # Packets sent
+        {'driver': 'GV4', 'value': 0, 'uom': 56},    # Packets received
+        {'driver': 'GV5', 'value': 0, 'uom': 56},    # Send errors
     ]
\ No newline at end of file
@@ -3,6 +3,8 @@ import sys
 import time
 import urllib3
 
+from utilities import govee_codec
+
 LOGGER = udi_interface.LOGGER
 
 class GoveeDevice(udi_interface.Node):
@@ -16,38 +18,53 @@ class GoveeDevice(udi_interface.Node):
         self._send = send_fn
 
         self.poly.subscribe(self.poly.START, self.start, address)
-        self.poly.subscribe(self.poly.POLL, self.poll)
 
     def start(self):
         pass
 
-    def poll(self, polltype):
-        if 'longPoll' in polltype:
-            LOGGER.debug('longPoll (node)')
-        else:
-            LOGGER.debug('shortPoll (node)')
-            if int(self.getDriver('ST')) == 1:
-                self.setDriver('ST',0)
-            else:
-                self.setDriver('ST',1)
+    @staticmethod
+    def buildPayload(cmd, value=None):
+        """Build the encoded LAN API message for a node command (DON, DOF, SET_BRI, SET_CLITEMP)"""
+        if cmd == 'DON':
+            return govee_codec.TURN_ON
+        if cmd == 'DOF':
+            return govee_codec.TURN_OFF
+        if cmd == 'SET_BRI':
+            return govee_codec.brightness(value)
+        if cmd == 'SET_CLITEMP':
+            return govee_codec.color_temp(value)
+        raise ValueError(f"Unsupported command: {cmd}")
+
+    @staticmethod
+    def expectedState(cmd, value=None):
+        """devStatus fields a light should report once a command has applied"""
+        if cmd == 'DON':
+            return {'onOff': 1}
+        if cmd == 'DOF':
+            return {'onOff': 0}
+        if cmd == 'SET_BRI':
+            return {'brightness': int(value)}
+        if cmd == 'SET_CLITEMP':
+            return {'colorTemInKelvin': int(value)}
+        return None
 
     def setOn(self, command=None):
         """Turn device on"""
         LOGGER.info(f'DON received for {self.address}')
-        payload = {"msg": {"cmd": "turn", "data": {"value": 1}}}
+        payload = self.buildPayload('DON')
         if self._send and self.ipAddress:
             try:
-                self._send(self.ipAddress, payload, expect_response=False)
+                self._send(self.ipAddress, payload, expect_response=False, kind='turn', expect=self.expectedState('DON'))
             except Exception as e:
                 LOGGER.debug(f"Failed to send ON to {self.ipAddress}: {e}")
         
     def setOff(self, command=None):
         """Turn device off"""
         LOGGER.info(f'DOF received for {self.address}')
-        payload = {"msg": {"cmd": "turn", "data": {"value": 0}}}
+        payload = self.buildPayload('DOF')
         if self._send and self.ipAddress:
             try:
-                self._send(self.ipAddress, payload, expect_response=False)
+                self._send(self.ipAddress, payload, expect_response=False, kind='turn', expect=self.expectedState('DOF'))
             except Exception as e:
                 LOGGER.debug(f"Failed to send OFF to {self.ipAddress}: {e}")
         
@@ -55,10 +72,10 @@ class GoveeDevice(udi_interface.Node):
         """Set brightness level"""
         value = int(command.get('value'))
         LOGGER.info(f'SET_BRI to {value} for {self.address}')
-        payload = {"msg": {"cmd": "brightness", "data": {"value": value}}}
+        payload = self.buildPayload('SET_BRI', value)
         if self._send and self.ipAddress:
             try:
-                self._send(self.ipAddress, payload, expect_response=False)
+                self._send(self.ipAddress, payload, expect_response=False, kind='brightness', expect=self.expectedState('SET_BRI', value))
             except Exception as e:
                 LOGGER.debug(f"Failed to send brightness to {self.ipAddress}: {e}")
         
@@ -66,10 +83,10 @@ class GoveeDevice(udi_interface.Node):
         """Set color temperature"""
         value = int(command.get('value'))
         LOGGER.info(f'SET_CLITEMP to {value}K for {self.address}')
-        payload = {"msg": {"cmd": "set_color_temp", "data": {"mired": value}}}
+        payload = self.buildPayload('SET_CLITEMP', value)
         if self._send and self.ipAddress:
             try:
-                self._send(self.ipAddress, payload, expect_response=False)
+                self._send(self.ipAddress, payload, expect_response=False, kind='colortemp', expect=self.expectedState('SET_CLITEMP', value))
             except Exception as e:
                 LOGGER.debug(f"Failed to send color temp to {self.ipAddress}: {e}")
     
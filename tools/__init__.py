@@ -0,0 +1,10 @@
+import sys
+
+try:
+    import udi_interface  # noqa: F401
+except ImportError:
+    pass
+else:
+    # Importing udi_interface points stdout/stderr at the Polyglot log; the
+    # tools in this package report on the console
+    sys.stdout, sys.stderr = sys.__stdout__, sys.__stderr__
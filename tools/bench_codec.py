@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+"""Micro-benchmark: govee_codec vs. json.dumps(payload).encode() for every
+message the node server sends, and packet_decoder vs. json.loads() for the
+datagrams it receives.
+
+    python -m tools.bench_codec [--number 200000]
+"""
+import argparse
+import json
+import timeit
+
+from utilities import govee_codec, packet_decoder
+
+
+def _json(payload):
+    return json.dumps(payload).encode('utf-8')
+
+
+CASES = [
+    ('scan',
+     lambda: _json({"msg": {"cmd": "scan", "data": {"account_topic": "reserve"}}}),
+     lambda: govee_codec.SCAN),
+    ('devStatus',
+     lambda: _json({"msg": {"cmd": "devStatus", "data": {}}}),
+     lambda: govee_codec.DEV_STATUS),
+    ('turn',
+     lambda: _json({"msg": {"cmd": "turn", "data": {"value": 1}}}),
+     lambda: govee_codec.turn(1)),
+    ('brightness',
+     lambda: _json({"msg": {"cmd": "brightness", "data": {"value": 73}}}),
+     lambda: govee_codec.brightness(73)),
+    ('colorTemInKelvin',
+     lambda: _json({"msg": {"cmd": "colorwc", "data": {"color": {"r": 0, "g": 0, "b": 0}, "colorTemInKelvin": 4500}}}),
+     lambda: govee_codec.color_temp(4500)),
+    ('colorwc',
+     lambda: _json({"msg": {"cmd": "colorwc", "data": {"color": {"r": 255, "g": 96, "b": 12}, "colorTemInKelvin": 0}}}),
+     lambda: govee_codec.colorwc(255, 96, 12)),
+]
+
+
+INBOUND = [
+    ('scan reply', b'{"msg":{"cmd":"scan","data":{"ip":"192.168.1.50","device":"D0:C9:A4:C1:38:18:5A:3C",'
+                   b'"sku":"H6008","bleVersionHard":"3.01.01","bleVersionSoft":"1.03.01",'
+                   b'"wifiVersionHard":"1.00.10","wifiVersionSoft":"1.02.03"}}}'),
+    ('devStatus reply', b'{"msg":{"cmd":"devStatus","data":{"onOff":1,"brightness":100,'
+                        b'"color":{"r":255,"g":255,"b":255},"colorTemInKelvin":2700}}}'),
+    ('ssdp (foreign)', b'M-SEARCH * HTTP/1.1\r\nHOST: 239.255.255.250:1900\r\nMAN: "ssdp:discover"\r\n'),
+]
+
+
+def _json_loads(data):
+    try:
+        return json.loads(data.decode('utf-8'))
+    except ValueError:
+        return None
+
+
+def run(number):
+    print(f"{'message':<18}{'json ns/op':>12}{'codec ns/op':>13}{'speedup':>10}")
+    for name, baseline, codec in CASES:
+        assert json.loads(baseline()) == json.loads(codec()), name
+        base = min(timeit.repeat(baseline, number=number, repeat=3)) / number * 1e9
+        fast = min(timeit.repeat(codec, number=number, repeat=3)) / number * 1e9
+        print(f"{name:<18}{base:>12.1f}{fast:>13.1f}{base / fast:>9.1f}x")
+
+    print(f"\n{'datagram':<18}{'json ns/op':>12}{'decode ns/op':>13}{'speedup':>10}   ({packet_decoder.BACKEND} backend)")
+    for name, data in INBOUND:
+        base = min(timeit.repeat(lambda: _json_loads(data), number=number, repeat=3)) / number * 1e9
+        fast = min(timeit.repeat(lambda: packet_decoder.decode(data), number=number, repeat=3)) / number * 1e9
+        print(f"{name:<18}{base:>12.1f}{fast:>13.1f}{base / fast:>9.1f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--number', type=int, default=200000, help='calls per timing run')
+    run(parser.parse_args().number)
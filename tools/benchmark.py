@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+"""Benchmark discovery, status sweep and command send paths against the simulator.
+
+For each fleet size a SimulatorFleet runs in a child process, so CPU time
+reported here belongs to the node server stack only. Measures:
+
+  - discovery: time from Controller start until every device is registered
+  - sweep: multicast devStatus until every reply went through processDevice
+  - send: GoveeClient.send_request throughput and per-call p50/p99
+  - fanout: one send_group_command across the whole fleet
+  - cpu/threads: process CPU seconds and live threads per phase
+
+    python -m tools.benchmark --sizes 10 100 1000 --output bench.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import threading
+import time
+
+from tools.govee_simulator import SimulatorFleet
+from tools.harness import start_controller
+
+
+def _percentile(ordered, pct):
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _serve_fleet(count, kwargs, ready, done):
+    fleet = SimulatorFleet(count, **kwargs)
+    fleet.start()
+    ready.set()
+    done.wait()
+    fleet.stop()
+
+
+class _Phase:
+    """Wall time, CPU time and peak thread count of one benchmark phase."""
+
+    def __enter__(self):
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        self.result = {}
+        return self
+
+    def __exit__(self, *exc):
+        self.result['wall_s'] = round(time.perf_counter() - self.wall, 6)
+        self.result['cpu_s'] = round(time.process_time() - self.cpu, 6)
+        self.result['threads'] = threading.active_count()
+
+
+def _wait_for(predicate, timeout):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+def run_size(count, sends_per_device, timeout, fleet_kwargs):
+    from utilities import govee_codec
+
+    ready = multiprocessing.Event()
+    done = multiprocessing.Event()
+    child = multiprocessing.Process(target=_serve_fleet, args=(count, fleet_kwargs, ready, done), daemon=True)
+    child.start()
+    ready.wait(30)
+
+    statuses = []
+    threads_idle = threading.active_count()
+
+    def on_packet(response, address):
+        if response.cmd == 'devStatus':
+            statuses.append(address[0])
+
+    result = {'devices': count}
+    try:
+        with _Phase() as phase:
+            poly, controller = start_controller(on_packet=on_packet)
+            complete = _wait_for(lambda: len(controller.registry) >= count, timeout)
+        phase.result['discovered'] = len(controller.registry)
+        phase.result['complete'] = complete
+        result['discovery'] = phase.result
+
+        # Keep the background poller out of the sweep and send measurements
+        controller.poller.stop()
+        time.sleep(0.5)
+        result['threads'] = {'baseline': threads_idle, 'running': threading.active_count()}
+
+        statuses.clear()
+        with _Phase() as phase:
+            controller.queryDevices()
+            complete = _wait_for(lambda: len(set(statuses)) >= count, timeout)
+        phase.result['replies'] = len(set(statuses))
+        phase.result['complete'] = complete
+        result['sweep'] = phase.result
+
+        ips = [node.ipAddress for node in controller.registry.nodes()]
+        latencies = []
+        with _Phase() as phase:
+            for i in range(sends_per_device):
+                payload = govee_codec.brightness(i % 101)
+                for ip in ips:
+                    started = time.perf_counter()
+                    controller.client.send_request(ip, payload)
+                    latencies.append(time.perf_counter() - started)
+        latencies.sort()
+        phase.result['messages'] = len(latencies)
+        phase.result['throughput_per_s'] = round(len(latencies) / phase.result['wall_s'], 1) if latencies else 0
+        phase.result['p50_us'] = round(_percentile(latencies, 50) * 1e6, 2) if latencies else None
+        phase.result['p99_us'] = round(_percentile(latencies, 99) * 1e6, 2) if latencies else None
+        result['send'] = phase.result
+
+        with _Phase() as phase:
+            fanout = controller.send_group_command(controller.registry.nodes(), 'DON')
+        phase.result['sent'] = fanout.sent
+        phase.result['fanout_ms'] = round(fanout.elapsed * 1000, 3)
+        result['fanout'] = phase.result
+
+        result['drivers'] = controller.shadow.stats()
+        result['polyglot_messages'] = poly.sent
+        controller.stop()
+    finally:
+        done.set()
+        child.join(10)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--sends', type=int, default=10, help='commands sent per device in the send phase')
+    parser.add_argument('--timeout', type=float, default=30.0, help='per-phase timeout in seconds')
+    parser.add_argument('--jitter', type=float, default=0.0, help='simulated reply jitter in seconds')
+    parser.add_argument('--loss', type=float, default=0.0, help='simulated inbound packet loss')
+    parser.add_argument('--output', help='write JSON results here instead of stdout')
+    args = parser.parse_args()
+
+    fleet_kwargs = {'jitter': args.jitter, 'loss': args.loss, 'seed': 1}
+    report = {
+        'timestamp': time.time(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'fleet': fleet_kwargs,
+        'results': [],
+    }
+    for size in args.sizes:
+        print(f"Benchmarking {size} devices...", file=sys.stderr)
+        report['results'].append(run_size(size, args.sends, args.timeout, fleet_kwargs))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
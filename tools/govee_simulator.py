@@ -0,0 +1,270 @@
+#!/usr/bin/env python
+"""Fleet of virtual Govee LAN devices for load testing without hardware.
+
+Each virtual light gets its own loopback address (127.77.x.y by default) and
+listens on the control port (4003) for devStatus/turn/brightness/colorwc.
+A shared discovery socket answers `scan` and `devStatus` on the multicast
+group and on unicast port 4001 (every virtual light replies to either).
+Replies go to the requester's address on the reply port (4002), as real
+lights do. Loss, reply latency/jitter and duplicate replies are configurable.
+
+    python -m tools.govee_simulator --devices 500 --loss 0.01 --latency 0.02
+    python -m tools.govee_simulator --devices 500 --controller
+"""
+import argparse
+import heapq
+import ipaddress
+import itertools
+import json
+import random
+import selectors
+import socket
+import struct
+import threading
+import time
+
+
+class VirtualDevice:
+    __slots__ = ('ip', 'device', 'sku', 'onOff', 'brightness', 'color', 'colorTemInKelvin', 'sock')
+
+    def __init__(self, ip, device, sku):
+        self.ip = ip
+        self.device = device
+        self.sku = sku
+        self.onOff = 0
+        self.brightness = 100
+        self.color = {'r': 255, 'g': 255, 'b': 255}
+        self.colorTemInKelvin = 2700
+        self.sock = None
+
+    def scan_reply(self):
+        return json.dumps({'msg': {'cmd': 'scan', 'data': {
+            'ip': self.ip,
+            'device': self.device,
+            'sku': self.sku,
+            'bleVersionHard': '3.01.01',
+            'bleVersionSoft': '1.03.01',
+            'wifiVersionHard': '1.00.10',
+            'wifiVersionSoft': '1.02.03',
+        }}}, separators=(',', ':')).encode('utf-8')
+
+    def status_reply(self):
+        return json.dumps({'msg': {'cmd': 'devStatus', 'data': {
+            'onOff': self.onOff,
+            'brightness': self.brightness,
+            'color': self.color,
+            'colorTemInKelvin': self.colorTemInKelvin,
+        }}}, separators=(',', ':')).encode('utf-8')
+
+    def apply(self, cmd, data):
+        if cmd == 'turn':
+            self.onOff = 1 if data.get('value') else 0
+        elif cmd == 'brightness':
+            self.brightness = int(data.get('value', self.brightness))
+        elif cmd == 'colorwc':
+            self.color = data.get('color', self.color)
+            self.colorTemInKelvin = int(data.get('colorTemInKelvin', self.colorTemInKelvin))
+        else:
+            return False
+        return True
+
+
+def device_id(index):
+    """Unique MAC-style id; the first 7 bytes (the node address) stay unique."""
+    return 'D0:C9:{:02X}:{:02X}:{:02X}:{:02X}:5A:3C'.format(
+        (index >> 24) & 0xFF, (index >> 16) & 0xFF, (index >> 8) & 0xFF, index & 0xFF)
+
+
+class SimulatorFleet:
+    """N virtual lights served from one selector thread.
+
+    Usage:
+      fleet = SimulatorFleet(500, loss=0.01, latency=0.02)
+      fleet.start()
+      ...
+      fleet.stop()
+    """
+
+    def __init__(self, count, base_ip='127.77.0.1', multicast_group='239.255.255.250', scan_port=4001,
+                 control_port=4003, reply_port=4002, loss=0.0, latency=0.0, jitter=0.0, duplicate=0.0,
+                 interface='127.0.0.1', seed=None):
+        base = ipaddress.IPv4Address(base_ip)
+        self.devices = [VirtualDevice(str(base + i), device_id(i), 'H6008') for i in range(count)]
+        self.by_ip = {d.ip: d for d in self.devices}
+        self.multicast_group = multicast_group
+        self.scan_port = scan_port
+        self.control_port = control_port
+        self.reply_port = reply_port
+        self.loss = loss
+        self.latency = latency
+        self.jitter = jitter
+        self.duplicate = duplicate
+        self.interface = interface
+        self.random = random.Random(seed)
+
+        self._selector = None
+        self._scan_socks = []
+        self._outbox = []
+        self._seq = itertools.count()
+        self._running = False
+        self._thread = None
+        self._wake_r = None
+        self._wake_w = None
+
+        self.received = 0
+        self.replied = 0
+        self.dropped = 0
+        self.duplicated = 0
+
+    def _bind_sockets(self):
+        self._selector = selectors.DefaultSelector()
+        for device in self.devices:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.bind((device.ip, self.control_port))
+            sock.setblocking(False)
+            device.sock = sock
+            self._selector.register(sock, selectors.EVENT_READ, device)
+
+        mcast = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        mcast.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        mcast.bind(('', self.scan_port))
+        mreq = struct.pack('4s4s', socket.inet_aton(self.multicast_group), socket.inet_aton(self.interface))
+        mcast.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
+        mcast.setblocking(False)
+        self._scan_socks.append(mcast)
+        self._selector.register(mcast, selectors.EVENT_READ, None)
+
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, 'wake')
+
+    def start(self):
+        self._bind_sockets()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='GoveeSimulator')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._wake_w:
+            self._wake_w.send(b'x')
+        if self._thread:
+            self._thread.join(timeout=2)
+        for key in list(self._selector.get_map().values()):
+            key.fileobj.close()
+        self._selector.close()
+        self._wake_w.close()
+
+    def _queue(self, sock, payload, addr):
+        delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+        copies = 2 if self.duplicate and self.random.random() < self.duplicate else 1
+        if copies == 2:
+            self.duplicated += 1
+        for _ in range(copies):
+            if delay <= 0:
+                self._send(sock, payload, addr)
+            else:
+                heapq.heappush(self._outbox, (time.monotonic() + delay, next(self._seq), sock, payload, addr))
+
+    def _send(self, sock, payload, addr):
+        try:
+            sock.sendto(payload, addr)
+            self.replied += 1
+        except OSError:
+            self.dropped += 1
+
+    def _handle(self, device, sock):
+        while True:
+            try:
+                data, addr = sock.recvfrom(4096)
+            except BlockingIOError:
+                return
+            self.received += 1
+            if self.loss and self.random.random() < self.loss:
+                self.dropped += 1
+                continue
+            try:
+                msg = json.loads(data)['msg']
+            except (ValueError, KeyError, TypeError):
+                continue
+            cmd = msg.get('cmd')
+            reply_addr = (addr[0], self.reply_port)
+            targets = [device] if device is not None else self.devices
+            if cmd == 'scan':
+                for target in targets:
+                    self._queue(target.sock, target.scan_reply(), reply_addr)
+            elif cmd == 'devStatus':
+                for target in targets:
+                    self._queue(target.sock, target.status_reply(), reply_addr)
+            elif device is None:
+                continue
+            else:
+                device.apply(cmd, msg.get('data', {}))
+
+    def _run(self):
+        while self._running:
+            timeout = None
+            if self._outbox:
+                timeout = max(0, self._outbox[0][0] - time.monotonic())
+            for key, _ in self._selector.select(timeout):
+                if key.data == 'wake':
+                    continue
+                if key.data is None:
+                    self._handle(None, key.fileobj)
+                else:
+                    self._handle(key.data, key.fileobj)
+            now = time.monotonic()
+            while self._outbox and self._outbox[0][0] <= now:
+                _, _, sock, payload, addr = heapq.heappop(self._outbox)
+                self._send(sock, payload, addr)
+
+    def stats(self):
+        return {
+            'devices': len(self.devices),
+            'received': self.received,
+            'replied': self.replied,
+            'dropped': self.dropped,
+            'duplicated': self.duplicated,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--devices', type=int, default=100)
+    parser.add_argument('--base-ip', default='127.77.0.1')
+    parser.add_argument('--loss', type=float, default=0.0, help='probability an inbound packet is dropped')
+    parser.add_argument('--latency', type=float, default=0.0, help='reply delay in seconds')
+    parser.add_argument('--jitter', type=float, default=0.0, help='extra random reply delay in seconds')
+    parser.add_argument('--duplicate', type=float, default=0.0, help='probability a reply is sent twice')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--controller', action='store_true', help='run the real Controller against the fleet')
+    parser.add_argument('--duration', type=float, default=15.0, help='seconds to run with --controller')
+    args = parser.parse_args()
+
+    fleet = SimulatorFleet(args.devices, base_ip=args.base_ip, loss=args.loss, latency=args.latency,
+                           jitter=args.jitter, duplicate=args.duplicate, seed=args.seed)
+    fleet.start()
+    print(f"Simulating {args.devices} devices from {fleet.devices[0].ip} to {fleet.devices[-1].ip}")
+    try:
+        if args.controller:
+            from tools.harness import start_controller
+            poly, controller = start_controller()
+            deadline = time.monotonic() + args.duration
+            while time.monotonic() < deadline and len(controller.registry) < args.devices:
+                time.sleep(0.1)
+            print(f"Controller discovered {len(controller.registry)}/{args.devices} devices")
+            controller.stop()
+        else:
+            while True:
+                time.sleep(5)
+                print(fleet.stats())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fleet.stop()
+        print(fleet.stats())
+
+
+if __name__ == '__main__':
+    main()
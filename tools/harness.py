@@ -0,0 +1,111 @@
+"""Stand-in Polyglot interface for running the real Controller offline.
+
+Implements the part of udi_interface.Interface the node server uses, so
+the tools in this package can drive Controller/GoveeDevice against the
+simulator or a recorded trace. udi_interface itself must be installed;
+only the connection to Polyglot is replaced. Log output still goes to
+logs/debug.log in the working directory.
+"""
+import threading
+
+
+class SimulatedPolyglot:
+    START = 'start'
+    STOP = 'stop'
+    DELETE = 'delete'
+    DELNODEDONE = 'delnodedone'
+    LOGLEVEL = 'setLogLevel'
+    CUSTOMPARAMS = 'customparams'
+    CUSTOMDATA = 'customdata'
+    CUSTOMTYPEDPARAMS = 'customtypedparams'
+    CUSTOMTYPEDDATA = 'customtypeddata'
+    POLL = 'poll'
+
+    def __init__(self):
+        self.nodes = {}
+        self.subscribers = {}
+        self.sent = 0
+        self.status_sent = 0
+        self._lock = threading.Lock()
+
+    def subscribe(self, event, callback, address=None):
+        self.subscribers.setdefault(event, []).append((callback, address))
+
+    def fire(self, event, *args, address=None):
+        for callback, target in list(self.subscribers.get(event, ())):
+            if target is None or address is None or target == address:
+                callback(*args)
+
+    def addNode(self, node, conn_status=None, rename=False):
+        with self._lock:
+            self.nodes[node.address] = node
+        return node
+
+    def db_getNodeDrivers(self, address):
+        # Node.__init__ restores driver values saved by Polyglot; start clean
+        return []
+
+    def getNode(self, address):
+        return self.nodes.get(address)
+
+    def getNodes(self):
+        return self.nodes
+
+    def delNode(self, address):
+        with self._lock:
+            self.nodes.pop(address, None)
+        self.fire(self.DELNODEDONE, {'address': address})
+
+    def send(self, message, type=None):
+        self.sent += 1
+        if type == 'status':
+            self.status_sent += 1
+
+    def ready(self):
+        pass
+
+    def updateProfile(self):
+        pass
+
+    def setCustomParamsDoc(self):
+        pass
+
+
+def build_controller(params=None):
+    """Build and configure a Controller on a SimulatedPolyglot without
+    starting it (no sockets are opened). Returns (poly, controller)."""
+    from nodes import Controller
+
+    poly = SimulatedPolyglot()
+    controller = Controller(poly, 'controller', 'controller', 'Govee WLAN Controller')
+    controller.parameterHandler(dict(params or {}))
+    controller.dataHandler({})
+    return poly, controller
+
+
+def start_controller(params=None, multicast_interface='127.0.0.1', on_packet=None):
+    """Build a Controller on a SimulatedPolyglot, start it and return both.
+
+    Multicast is pinned to `multicast_interface` (via the `interfaces`
+    parameter) so the startup scan reaches a loopback simulator fleet.
+    `on_packet(response, address)` is called after the controller has
+    processed each inbound packet.
+    """
+    from nodes import Controller
+
+    poly = SimulatedPolyglot()
+    controller = Controller(poly, 'controller', 'controller', 'Govee WLAN Controller')
+    if on_packet is not None:
+        process = controller.listener.callback
+
+        def observed(response, address):
+            process(response, address)
+            on_packet(response, address)
+        controller.listener.callback = observed
+    params = dict(params or {})
+    if multicast_interface:
+        params.setdefault('interfaces', multicast_interface)
+    controller.parameterHandler(params)
+    controller.dataHandler({})
+    poly.fire(poly.START, address='controller')
+    return poly, controller
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""Replay a packet trace through the node server under cProfile.
+
+Captures come from the `traceFile` parameter (see utilities/packet_trace.py).
+The inbound datagrams of a trace are fed on the main thread through the
+listener pipeline (foreign filter, dedupe on the recorded clock, decode) into
+Controller.processDevice of an offline Controller: no sockets are opened and
+nothing is sent, so the same trace gives the same work on every run.
+New devices are provisioned inline so they show up in the profile; node
+driver updates still flush on the timer wheel thread.
+
+    python -m tools.replay_trace govee.trace                  # as fast as possible
+    python -m tools.replay_trace govee.trace --speed 1        # recorded timing
+    python -m tools.replay_trace govee.trace --speed 10 --profile replay.prof
+    python -m tools.replay_trace govee.trace --direct         # decode + processDevice only
+"""
+import argparse
+import cProfile
+import pstats
+import time
+
+from tools.harness import build_controller
+from utilities import packet_decoder, read_trace
+from utilities.packet_trace import RX, trace_started
+
+
+def load(path):
+    """Return (inbound, outbound count) for a trace; inbound as (offset, data, addr)."""
+    inbound = []
+    outbound = 0
+    for offset, direction, addr, data in read_trace(path):
+        if direction == RX:
+            inbound.append((offset, data, addr))
+        else:
+            outbound += 1
+    return inbound, outbound
+
+
+def replay(inbound, controller, speed=0.0, direct=False):
+    """Feed `inbound` into `controller`; returns the elapsed seconds."""
+    process = controller.processDevice
+    listener = controller.listener.listener
+    decode = packet_decoder.decode
+    first = inbound[0][0] if inbound else 0.0
+    started = time.perf_counter()
+    for offset, data, addr in inbound:
+        if speed > 0:
+            delay = (offset - first) / speed - (time.perf_counter() - started)
+            if delay > 0:
+                time.sleep(delay)
+        if direct:
+            response = decode(data)
+            if response is not None:
+                process(response, addr)
+        else:
+            listener.handle(data, addr, process, now=offset)
+    controller.provisioner.flush()
+    return time.perf_counter() - started
+
+
+def run(args):
+    inbound, outbound = load(args.trace)
+    span = inbound[-1][0] - inbound[0][0] if inbound else 0.0
+    print(f"{args.trace}: {len(inbound)} inbound / {outbound} outbound packets over {span:.1f}s, "
+          f"captured {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(trace_started(args.trace)))}")
+
+    params = dict(param.split('=', 1) for param in args.param)
+    poly, controller = build_controller(params)
+    # Provision on the replay thread rather than a dispatcher worker so the
+    # node creation cost is part of the profile
+    controller.provisioner._add = controller._provision
+    controller.wheel.start()
+    controller.dispatcher.start()
+
+    profiler = cProfile.Profile() if args.profile or args.top else None
+    try:
+        if profiler:
+            profiler.enable()
+        elapsed = replay(inbound, controller, args.speed, args.direct)
+        if profiler:
+            profiler.disable()
+        # Let the wheel publish the last driver updates
+        time.sleep(0.1)
+    finally:
+        controller.stop()
+
+    per_packet = elapsed / len(inbound) * 1e6 if inbound else 0.0
+    rate = len(inbound) / elapsed if elapsed else 0.0
+    print(f"replayed in {elapsed * 1000:.1f}ms ({per_packet:.1f}us/packet, {rate:,.0f} packets/s) "
+          f"via {'processDevice' if args.direct else 'listener pipeline'}, {packet_decoder.BACKEND} decoder"
+          f"{f', paced at {args.speed:g}x' if args.speed > 0 else ''}")
+    print(f"nodes: {len(controller.registry)}  listener: {controller.listener.listener.stats()}")
+
+    if profiler:
+        if args.profile:
+            profiler.dump_stats(args.profile)
+            print(f"profile written to {args.profile}")
+        if args.top:
+            pstats.Stats(profiler).strip_dirs().sort_stats(args.sort).print_stats(args.top)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('trace', help='trace file written with the traceFile parameter')
+    parser.add_argument('--speed', type=float, default=0.0,
+                        help='replay speed relative to the capture (1 = recorded timing, 0 = no pacing; default 0)')
+    parser.add_argument('--direct', action='store_true',
+                        help='skip the listener filters and call processDevice with decoded replies')
+    parser.add_argument('--profile', help='write raw cProfile stats to this file (for snakeviz, pstats, ...)')
+    parser.add_argument('--top', type=int, default=25, help='print this many profile rows (0 for none)')
+    parser.add_argument('--sort', default='cumulative', help='pstats sort key (default cumulative)')
+    parser.add_argument('--param', action='append', default=[], metavar='KEY=VALUE',
+                        help='controller custom parameter, e.g. --param metrics=false (repeatable)')
+    run(parser.parse_args())
@@ -1,7 +1,54 @@
 from .govee_client import GoveeClient, send_to_device
 from .govee_listener import GoveeListener
+from . import govee_codec
+from . import netif
+from . import packet_decoder
+from .metrics import METRICS, Metrics
+from .packet_log import PACKETS, PacketLog
+from .packet_trace import TRACE, PacketTrace, read_trace
+from .device_registry import DeviceRegistry
+from .device_cache import DeviceCache
+from .provisioner import NodeProvisioner
+from .timer_wheel import TimerWheel
+from .command_queue import CommandCoalescer
+from .dispatcher import CommandDispatcher
+from .status_poller import StatusPoller
+from .liveness import LivenessTracker
+from .driver_shadow import DriverShadow
+from .reliable import ReliableDelivery
+from .fanout import FanoutSender, FanoutResult
+from .frame_stream import FrameStreamer
+from .control_server import LocalControlServer
+from .async_transport import AsyncGoveeClient, AsyncGoveeListener, EventLoopThread
 __all__ = [
     'GoveeClient',
     'send_to_device',
     'GoveeListener',
+    'govee_codec',
+    'netif',
+    'packet_decoder',
+    'METRICS',
+    'Metrics',
+    'PACKETS',
+    'PacketLog',
+    'TRACE',
+    'PacketTrace',
+    'read_trace',
+    'DeviceRegistry',
+    'DeviceCache',
+    'NodeProvisioner',
+    'TimerWheel',
+    'CommandCoalescer',
+    'CommandDispatcher',
+    'StatusPoller',
+    'LivenessTracker',
+    'DriverShadow',
+    'ReliableDelivery',
+    'FanoutSender',
+    'FanoutResult',
+    'FrameStreamer',
+    'LocalControlServer',
+    'AsyncGoveeClient',
+    'AsyncGoveeListener',
+    'EventLoopThread',
 ]
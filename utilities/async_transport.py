@@ -0,0 +1,267 @@
+import asyncio
+import socket
+import struct
+import threading
+import udi_interface
+
+from . import govee_codec, packet_decoder
+
+LOGGER = udi_interface.LOGGER
+
+
+class _PendingReplies:
+    """Futures waiting on a reply from a device, keyed by device IP.
+
+    Govee lights answer from their own address, so the source IP of a reply
+    is enough to hand it to whoever is waiting. Every waiter for that IP gets
+    the same reply.
+    """
+
+    def __init__(self):
+        self._waiters = {}
+
+    def add(self, ip, future):
+        self._waiters.setdefault(ip, []).append(future)
+
+    def discard(self, ip, future):
+        waiters = self._waiters.get(ip)
+        if not waiters:
+            return
+        try:
+            waiters.remove(future)
+        except ValueError:
+            pass
+        if not waiters:
+            del self._waiters[ip]
+
+    def resolve(self, ip, payload):
+        waiters = self._waiters.pop(ip, None)
+        if not waiters:
+            return False
+        for future in waiters:
+            if not future.done():
+                future.set_result(payload)
+        return True
+
+    def cancel_all(self):
+        for waiters in self._waiters.values():
+            for future in waiters:
+                if not future.done():
+                    future.cancel()
+        self._waiters.clear()
+
+    def __len__(self):
+        return sum(len(w) for w in self._waiters.values())
+
+
+class _GoveeProtocol(asyncio.DatagramProtocol):
+    def __init__(self, on_datagram):
+        self.on_datagram = on_datagram
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.on_datagram(data, addr)
+
+    def error_received(self, exc):
+        LOGGER.debug(f"Govee datagram error: {exc}")
+
+
+def _decode(data, addr):
+    if packet_decoder.is_foreign(data):
+        return None
+    try:
+        return packet_decoder.loads(data)
+    except Exception as e:
+        LOGGER.debug(f"Failed to decode JSON from {addr}: {e}")
+        return None
+
+
+class AsyncGoveeListener:
+    """asyncio counterpart of GoveeListener.
+
+    Binds the multicast reply port once and delivers `(response, address)`
+    to the callback from the event loop. Also resolves the futures of any
+    `AsyncGoveeClient` request waiting on a reply from the sending IP.
+
+    Example:
+        listener = AsyncGoveeListener(multicastGroup, receivePort)
+        await listener.start(callback=cb)
+        ...
+        listener.stop()
+    """
+    def __init__(self, multicastGroup='239.255.255.250', receivePort=4002):
+        self.multicastGroup = multicastGroup
+        self.receivePort = receivePort
+
+        self.transport = None
+        self.running = False
+        self.pending = _PendingReplies()
+        self._callback = None
+
+    def _setup_socket(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(('', self.receivePort))
+        mreq = struct.pack('4sL', socket.inet_aton(self.multicastGroup), socket.INADDR_ANY)
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
+        sock.setblocking(False)
+        return sock
+
+    def _on_datagram(self, data, addr):
+        payload = _decode(data, addr)
+        if payload is None:
+            return
+        self.pending.resolve(addr[0], payload)
+        if self._callback:
+            try:
+                self._callback(payload, addr)
+            except Exception as e:
+                LOGGER.debug(f"Listener callback error: {e}")
+
+    async def start(self, callback=None):
+        if self.running:
+            return
+        self._callback = callback
+        loop = asyncio.get_running_loop()
+        self.transport, _ = await loop.create_datagram_endpoint(
+            lambda: _GoveeProtocol(self._on_datagram), sock=self._setup_socket())
+        self.running = True
+        LOGGER.debug(f"AsyncGoveeListener listening on port {self.receivePort}")
+
+    def stop(self):
+        self.running = False
+        self.pending.cancel_all()
+        if self.transport:
+            self.transport.close()
+            self.transport = None
+
+
+class AsyncGoveeClient:
+    """asyncio counterpart of GoveeClient sharing one socket for every request.
+
+    `send_request(..., expect_response=True)` awaits a per-request future
+    keyed by the device IP rather than blocking a thread on `recvfrom`.
+    Lights send `devStatus` replies to the listener port, so pass the
+    `AsyncGoveeListener` in use; replies that come back to the client's own
+    socket resolve the same futures.
+
+    Usage:
+      client = AsyncGoveeClient(timeout=2.0, listener=listener)
+      status = await client.send_request('192.168.1.50', {'msg': {...}}, expect_response=True)
+      client.close()
+    """
+
+    def __init__(self, port: int = 4003, timeout: float = 2.0, listener: AsyncGoveeListener | None = None):
+        self.port = port
+        self.timeout = timeout
+        self.listener = listener
+        self.transport = None
+        self.pending = _PendingReplies()
+        self._connecting = None
+
+    def _on_datagram(self, data, addr):
+        payload = _decode(data, addr)
+        if payload is None:
+            return
+        self.pending.resolve(addr[0], payload)
+        if self.listener:
+            self.listener.pending.resolve(addr[0], payload)
+
+    async def _ensure_transport(self):
+        if self.transport is not None:
+            return self.transport
+        if self._connecting is None:
+            loop = asyncio.get_running_loop()
+            self._connecting = loop.create_task(loop.create_datagram_endpoint(
+                lambda: _GoveeProtocol(self._on_datagram), family=socket.AF_INET,
+                local_addr=('0.0.0.0', 0)))
+        try:
+            self.transport, _ = await self._connecting
+        finally:
+            self._connecting = None
+        return self.transport
+
+    async def send_request(self, ip: str, payload, port: int | None = None, expect_response: bool = False):
+        """Send a JSON payload (dict or pre-encoded bytes) to `ip:port` via UDP.
+
+        If `expect_response` is True, waits up to `timeout` for the next reply
+        from `ip`. Returns parsed JSON response or None on timeout/no-response.
+        """
+        target_port = port or self.port
+        message = govee_codec.encode(payload)
+        transport = await self._ensure_transport()
+
+        if not expect_response:
+            transport.sendto(message, (ip, target_port))
+            return None
+
+        future = asyncio.get_running_loop().create_future()
+        pending = self.listener.pending if self.listener else self.pending
+        pending.add(ip, future)
+        try:
+            transport.sendto(message, (ip, target_port))
+            return await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            pending.discard(ip, future)
+
+    async def send_multicast(self, payload, multicast_group: str = '239.255.255.250', port: int = 4001, ttl: int = 2):
+        """Send a JSON payload to a multicast group/port."""
+        message = govee_codec.encode(payload)
+        transport = await self._ensure_transport()
+        sock = transport.get_extra_info('socket')
+        try:
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, ttl)
+        except Exception:
+            # not fatal; continue to send
+            pass
+        transport.sendto(message, (multicast_group, port))
+
+    def close(self):
+        self.pending.cancel_all()
+        if self.transport:
+            self.transport.close()
+            self.transport = None
+
+
+class EventLoopThread:
+    """Runs an asyncio event loop on a daemon thread for use from sync code.
+
+    Usage:
+      loop_thread = EventLoopThread()
+      loop_thread.start()
+      status = loop_thread.run(client.send_request(ip, payload, expect_response=True))
+      loop_thread.stop()
+    """
+
+    def __init__(self):
+        self.loop = None
+        self.thread = None
+
+    def start(self):
+        if self.thread:
+            return
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name='GoveeAsync')
+        self.thread.daemon = True
+        self.thread.start()
+
+    def submit(self, coro):
+        """Schedule `coro` on the loop and return a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout=None):
+        return self.submit(coro).result(timeout)
+
+    def stop(self):
+        if not self.thread:
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=2)
+        self.loop.close()
+        self.thread = None
+        self.loop = None
@@ -0,0 +1,92 @@
+import threading
+import udi_interface
+
+LOGGER = udi_interface.LOGGER
+
+
+class CommandCoalescer:
+    """Per-device outbound queue that collapses slider bursts.
+
+    Commands of a coalescing kind (brightness, color temperature) wait up to
+    `window` seconds; a newer command of the same kind for the same device
+    replaces the pending one (last write wins). Immediate kinds (on/off) are
+    sent at once, after flushing whatever is pending for that device so the
+    device still sees commands in the order they were issued.
+
+    `send_fn(ip, payload, expect)` receives the optional `expect` passed to
+    `submit` along with the payload that carried it.
+
+    `submit(..., immediate=True)` skips the window for one command (local
+    control): a pending command of the same kind is superseded and dropped,
+    anything else pending for the device is flushed first.
+
+    Usage:
+      queue = CommandCoalescer(send_fn, wheel, window=0.05)
+      queue.submit('192.168.1.50', 'brightness', payload)
+      queue.stats()
+    """
+
+    IMMEDIATE = frozenset(('turn',))
+
+    def __init__(self, send_fn, wheel, window: float = 0.05):
+        self._send = send_fn
+        self.wheel = wheel
+        self.window = window
+        self._pending = {}
+        self._timers = {}
+        self._lock = threading.RLock()
+
+        self.submitted = 0
+        self.sent = 0
+        self.coalesced = 0
+
+    def submit(self, ip, kind, payload, expect=None, immediate=False):
+        with self._lock:
+            self.submitted += 1
+            if immediate or kind in self.IMMEDIATE or self.window <= 0:
+                pending = self._pending.get(ip)
+                if pending and pending.pop(kind, None) is not None:
+                    self.coalesced += 1
+                self._flush_locked(ip)
+                self._deliver(ip, payload, expect)
+                return
+
+            pending = self._pending.setdefault(ip, {})
+            if kind in pending:
+                self.coalesced += 1
+            pending[kind] = (payload, expect)
+            if ip not in self._timers:
+                self._timers[ip] = self.wheel.schedule(self.window, self.flush, ip)
+
+    def flush(self, ip):
+        with self._lock:
+            self._flush_locked(ip)
+
+    def flush_all(self):
+        with self._lock:
+            for ip in list(self._pending):
+                self._flush_locked(ip)
+
+    def _flush_locked(self, ip):
+        self.wheel.cancel(self._timers.pop(ip, None))
+        pending = self._pending.pop(ip, None)
+        if not pending:
+            return
+        for payload, expect in pending.values():
+            self._deliver(ip, payload, expect)
+
+    def _deliver(self, ip, payload, expect):
+        self.sent += 1
+        try:
+            self._send(ip, payload, expect)
+        except Exception as e:
+            LOGGER.debug(f"Failed to send queued command to {ip}: {e}")
+
+    def stats(self):
+        with self._lock:
+            return {
+                'submitted': self.submitted,
+                'sent': self.sent,
+                'coalesced': self.coalesced,
+                'pending': sum(len(p) for p in self._pending.values()),
+            }
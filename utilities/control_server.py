@@ -0,0 +1,167 @@
+import select
+import socket
+import threading
+import udi_interface
+
+LOGGER = udi_interface.LOGGER
+
+
+# Allowed (min, max) for each argument; ct matches the CLITEMP editor
+COMMANDS = {
+    'on': (),
+    'off': (),
+    'bri': ((0, 100),),
+    'ct': ((2000, 9000),),
+    'color': ((0, 255),) * 3,
+}
+
+
+def parse_frame(data):
+    """Parse one datagram of newline separated commands.
+
+    Each line is `<target> <command> [args...]`, e.g. `d0c9a4c138185a on`,
+    `192.168.1.50 bri 40`, `D0:C9:A4:C1:38:18:5A:3C color 255 0 0`.
+    Returns (commands, errors): commands as (target, command, [int args])
+    tuples and errors as (line number, message). Arguments outside the
+    ranges in COMMANDS are errors; only valid commands are returned.
+    """
+    commands = []
+    errors = []
+    for number, line in enumerate(data.decode('utf-8', 'replace').splitlines(), 1):
+        parts = line.split()
+        if not parts or parts[0].startswith('#'):
+            continue
+        if len(parts) < 2:
+            errors.append((number, 'expected: <target> <command> [args]'))
+            continue
+        target, command, args = parts[0], parts[1].lower(), parts[2:]
+        ranges = COMMANDS.get(command)
+        if ranges is None:
+            errors.append((number, f'unknown command {command}'))
+            continue
+        if len(args) != len(ranges):
+            errors.append((number, f'{command} takes {len(ranges)} argument(s)'))
+            continue
+        try:
+            values = [int(arg) for arg in args]
+        except ValueError:
+            errors.append((number, f'{command} arguments must be integers'))
+            continue
+        bad = [(value, low, high) for value, (low, high) in zip(values, ranges) if not low <= value <= high]
+        if bad:
+            value, low, high = bad[0]
+            errors.append((number, f'{command} {value} out of range {low}-{high}'))
+            continue
+        commands.append((target, command, values))
+    return commands, errors
+
+
+class LocalControlServer:
+    """Localhost UDP endpoint for driving lights without the ISY round trip.
+
+    Every datagram is a batch of command lines (see `parse_frame`), handed
+    to `handler(commands)`, which returns a list of (target, reason) for the
+    commands it could not apply. The sender gets a one-line reply:
+    `ok <applied>` or `err <applied> <line or target>:<reason>; ...`.
+    Only loopback addresses are bound.
+
+    Usage:
+      server = LocalControlServer(handler, port=4010)
+      server.start()
+      ...
+      server.stop()
+
+      $ printf 'd0c9a4c138185a on\\nd0c9a4c138185a bri 40\\n' | nc -u -w1 127.0.0.1 4010
+    """
+
+    def __init__(self, handler, host: str = '127.0.0.1', port: int = 4010, timeout: float = 1.0):
+        self.handler = handler
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.sock = None
+        self.running = False
+        self.thread = None
+
+        self.frames = 0
+        self.commands = 0
+        self.errors = 0
+
+    def start(self):
+        if self.running:
+            return
+        if not self.host.startswith('127.') and self.host != 'localhost':
+            raise ValueError(f"Local control only binds to loopback, not {self.host}")
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            self.sock.bind((self.host, self.port))
+        except (OSError, OverflowError):
+            self.sock.close()
+            self.sock = None
+            raise
+        self.sock.setblocking(False)
+        self.running = True
+        self.thread = threading.Thread(target=self._serve, name='GoveeLocalControl')
+        self.thread.daemon = True
+        self.thread.start()
+        LOGGER.info(f"Local control listening on udp://{self.host}:{self.port}")
+
+    def _serve(self):
+        while self.running:
+            try:
+                readable, _, _ = select.select([self.sock], [], [], self.timeout)
+            except (OSError, ValueError):
+                return
+            if not readable:
+                continue
+            while self.running:
+                try:
+                    data, addr = self.sock.recvfrom(65535)
+                except BlockingIOError:
+                    break
+                except OSError:
+                    return
+                self._handle(data, addr)
+
+    def _handle(self, data, addr):
+        self.frames += 1
+        commands, errors = parse_frame(data)
+        applied = 0
+        if commands:
+            try:
+                failures = self.handler(commands) or []
+                applied = len(commands) - len(failures)
+                errors.extend(failures)
+            except Exception as e:
+                LOGGER.error(f"Local control handler failed: {e}")
+                errors.append((0, str(e)))
+        self.commands += applied
+        self.errors += len(errors)
+        if errors:
+            detail = '; '.join(f'{where}:{reason}' for where, reason in errors)
+            reply = f'err {applied} {detail}\n'
+        else:
+            reply = f'ok {applied}\n'
+        try:
+            self.sock.sendto(reply.encode('utf-8'), addr)
+        except OSError:
+            pass
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=2)
+            self.thread = None
+        if self.sock:
+            try:
+                self.sock.close()
+            except Exception:
+                pass
+            self.sock = None
+
+    def stats(self):
+        return {
+            'frames': self.frames,
+            'commands': self.commands,
+            'errors': self.errors,
+        }
@@ -0,0 +1,126 @@
+import threading
+import time
+import udi_interface
+
+LOGGER = udi_interface.LOGGER
+
+
+class CachedDevice:
+    """One remembered device: identity, last IP and last reported state."""
+    __slots__ = ('address', 'deviceId', 'ipAddress', 'sku', 'name', 'st', 'gv0', 'gv1', 'lastSeen')
+
+    def __init__(self, address, deviceId, ipAddress, sku, name, st=0, gv0=0, gv1=2700, lastSeen=0.0):
+        self.address = address
+        self.deviceId = deviceId
+        self.ipAddress = ipAddress
+        self.sku = sku
+        self.name = name
+        self.st = st
+        self.gv0 = gv0
+        self.gv1 = gv1
+        self.lastSeen = lastSeen
+
+    def pack(self):
+        return [self.deviceId, self.ipAddress, self.sku, self.name, self.st, self.gv0, self.gv1, round(self.lastSeen)]
+
+    @classmethod
+    def unpack(cls, address, values):
+        return cls(address, *values)
+
+
+class DeviceCache:
+    """Discovered devices persisted to Polyglot custom data for warm starts.
+
+    Entries are stored compactly as `{address: [deviceId, ip, sku, name, ST,
+    GV0, GV1, lastSeen]}` under one key. Only an update that changes an
+    entry's identity, IP or state marks the cache dirty; the write back to
+    Polyglot is debounced on the timer wheel so a status sweep costs one
+    save, not one per device. A new `lastSeen` alone is kept in memory and
+    written by `checkpoint()` (long poll) or `save()` (shutdown).
+
+    Usage:
+      cache = DeviceCache(self.Data, wheel)
+      for entry in cache.load(): ...
+      cache.update(node, st=1, gv0=80)
+      cache.checkpoint()
+    """
+
+    KEY = 'devices'
+
+    def __init__(self, store, wheel, delay: float = 10.0):
+        self.store = store
+        self.wheel = wheel
+        self.delay = delay
+        self._entries = {}
+        self._timer = None
+        self._seen_dirty = False
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Read entries from the store and return them."""
+        raw = self.store.get(self.KEY) or {}
+        entries = {}
+        for address, values in raw.items():
+            try:
+                entries[address] = CachedDevice.unpack(address, values)
+            except TypeError:
+                LOGGER.warning(f"Ignoring malformed cache entry for {address}: {values}")
+        with self._lock:
+            self._entries = entries
+        LOGGER.info(f"Loaded {len(entries)} cached devices")
+        return list(entries.values())
+
+    def get(self, address):
+        return self._entries.get(address)
+
+    def update(self, node, st=None, gv0=None, gv1=None, seen=True):
+        """Record the node's identity and any state given; schedules a save
+        if anything but `lastSeen` changed."""
+        with self._lock:
+            entry = self._entries.get(node.address)
+            if entry is None:
+                entry = CachedDevice(node.address, node.deviceId, node.ipAddress, node.sku, node.name)
+                self._entries[node.address] = entry
+                changed = True
+            else:
+                changed = (entry.deviceId, entry.ipAddress, entry.sku) != (node.deviceId, node.ipAddress, node.sku)
+                entry.deviceId = node.deviceId
+                entry.ipAddress = node.ipAddress
+                entry.sku = node.sku
+            for attr, value in (('st', st), ('gv0', gv0), ('gv1', gv1)):
+                if value is not None and getattr(entry, attr) != value:
+                    setattr(entry, attr, value)
+                    changed = True
+            if seen:
+                entry.lastSeen = time.time()
+                self._seen_dirty = True
+            if changed:
+                self._schedule_locked()
+
+    def checkpoint(self):
+        """Save if only `lastSeen` times changed since the last save."""
+        with self._lock:
+            due = self._seen_dirty and self._timer is None
+        if due:
+            self.save()
+
+    def remove(self, address):
+        with self._lock:
+            if self._entries.pop(address, None) is not None:
+                self._schedule_locked()
+
+    def _schedule_locked(self):
+        if self._timer is None:
+            self._timer = self.wheel.schedule(self.delay, self.save)
+
+    def save(self):
+        with self._lock:
+            self.wheel.cancel(self._timer)
+            self._timer = None
+            self._seen_dirty = False
+            packed = {address: entry.pack() for address, entry in self._entries.items()}
+        try:
+            self.store[self.KEY] = packed
+            LOGGER.debug(f"Saved {len(packed)} devices to cache")
+        except Exception as e:
+            LOGGER.error(f"Failed to save device cache: {e}")
@@ -0,0 +1,96 @@
+import threading
+import udi_interface
+
+LOGGER = udi_interface.LOGGER
+
+
+class DeviceRegistry:
+    """Indexes device nodes by IP address and by Govee device id.
+
+    The listener thread resolves every `devStatus` reply by source IP, so the
+    lookups here are plain dict hits instead of a scan over `poly.getNodes()`.
+
+    Usage:
+      registry = DeviceRegistry()
+      registry.add(node)
+      registry.update_ip(node, '192.168.1.51')
+      node = registry.get_by_ip('192.168.1.51')
+      registry.remove(node.address)
+    """
+
+    def __init__(self):
+        self._by_ip = {}
+        self._by_id = {}
+        self._by_address = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize_id(device_id):
+        """Govee reports ids as 'AA:BB:...'; index them without colons, lowercased."""
+        return (device_id or '').replace(':', '').lower()
+
+    def add(self, node):
+        with self._lock:
+            self._remove_locked(node.address)
+            self._by_address[node.address] = node
+            self._by_id[self.normalize_id(node.deviceId)] = node
+            if node.ipAddress:
+                self._by_ip[node.ipAddress] = node
+
+    def update_ip(self, node, ip):
+        """Set `node.ipAddress` and move its IP index entry if it changed."""
+        with self._lock:
+            old_ip = node.ipAddress
+            if old_ip == ip and self._by_ip.get(ip) is node:
+                return False
+            if old_ip and self._by_ip.get(old_ip) is node:
+                del self._by_ip[old_ip]
+            node.ipAddress = ip
+            if ip:
+                previous = self._by_ip.get(ip)
+                if previous is not None and previous is not node:
+                    # DHCP handed this address to another light; the old owner
+                    # keeps its stale IP until it answers a scan again.
+                    LOGGER.debug(f"IP {ip} moved from {previous.address} to {node.address}")
+                self._by_ip[ip] = node
+            return old_ip != ip
+
+    def remove(self, address):
+        with self._lock:
+            return self._remove_locked(address)
+
+    def _remove_locked(self, address):
+        node = self._by_address.pop(address, None)
+        if node is None:
+            return None
+        if self._by_ip.get(node.ipAddress) is node:
+            del self._by_ip[node.ipAddress]
+        device_key = self.normalize_id(node.deviceId)
+        if self._by_id.get(device_key) is node:
+            del self._by_id[device_key]
+        return node
+
+    def get_by_ip(self, ip):
+        return self._by_ip.get(ip)
+
+    def get_by_id(self, device_id):
+        return self._by_id.get(self.normalize_id(device_id))
+
+    def get_by_address(self, address):
+        return self._by_address.get(address)
+
+    def nodes(self):
+        with self._lock:
+            return list(self._by_address.values())
+
+    def clear(self):
+        with self._lock:
+            self._by_ip.clear()
+            self._by_id.clear()
+            self._by_address.clear()
+
+    def __len__(self):
+        return len(self._by_address)
+
+    def __contains__(self, address):
+        return address in self._by_address
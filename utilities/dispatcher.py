@@ -0,0 +1,197 @@
+import collections
+import threading
+import time
+import udi_interface
+from concurrent.futures import Future
+
+from .metrics import METRICS
+
+LOGGER = udi_interface.LOGGER
+
+
+class CommandDispatcher:
+    """Runs device sends on a small worker pool so callers never block.
+
+    Work is queued per device IP. Each device's queue is served by at most
+    one worker at a time, so commands to one light run in the order they
+    were submitted, while a light that is slow to send to only holds up its
+    own queue. A worker runs one item and then puts the device back in line,
+    so a busy light cannot starve the others. At most `max_pending` items
+    wait in total; beyond that `submit` refuses new work.
+
+    `request()` sends and returns a Future for the light's next reply. The
+    reply is not read from a private socket; whoever receives it (the shared
+    listener) hands it over with `resolve(ip, payload)`, so the Future's
+    result is whatever the listener decoded the reply to. Futures that see no
+    reply within `timeout` resolve to None.
+
+    Usage:
+      dispatcher = CommandDispatcher(workers=4)
+      dispatcher.start()
+      dispatcher.submit('192.168.1.50', send_fn, '192.168.1.50', payload)
+      future = dispatcher.request('192.168.1.50', send_fn, '192.168.1.50', payload)
+      dispatcher.resolve('192.168.1.50', response)   # from the listener callback
+      dispatcher.stop()
+    """
+
+    def __init__(self, workers: int = 4, max_pending: int = 1024, timeout: float = 2.0, wheel=None):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.wheel = wheel
+
+        self._queues = {}
+        self._ready = collections.deque()
+        self._pending = 0
+        self._waiters = {}
+        self._cond = threading.Condition()
+        self._threads = []
+        self.running = False
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.max_depth = 0
+        self.replies = 0
+        self.timeouts = 0
+
+    def start(self):
+        with self._cond:
+            if self.running:
+                return
+            self.running = True
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f'GoveeDispatch-{index}')
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 2.0):
+        """Stop the workers once queued work has drained (or `timeout` passes)."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._pending and time.monotonic() < deadline:
+                self._cond.wait(0.05)
+            self.running = False
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=max(0.1, deadline - time.monotonic()))
+        self._threads = []
+        with self._cond:
+            waiters, self._waiters = self._waiters, {}
+        for futures in waiters.values():
+            for future in futures:
+                if not future.done():
+                    future.set_result(None)
+
+    def submit(self, ip, fn, *args):
+        """Queue `fn(*args)` behind earlier work for `ip`. False if the pool is full."""
+        with self._cond:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                return False
+            self.submitted += 1
+            self._pending += 1
+            if self._pending > self.max_depth:
+                self.max_depth = self._pending
+            queue = self._queues.get(ip)
+            if queue is None:
+                # Not queued or running: this device joins the ready line
+                queue = self._queues[ip] = collections.deque()
+                self._ready.append(ip)
+                self._cond.notify_all()
+            queue.append((fn, args))
+        return True
+
+    def request(self, ip, fn, *args, timeout: float | None = None):
+        """Queue `fn(*args)` and return a Future for the next reply from `ip`."""
+        future = Future()
+        with self._cond:
+            self._waiters.setdefault(ip, []).append(future)
+        if not self.submit(ip, fn, *args):
+            self._discard(ip, future)
+            future.set_result(None)
+            return future
+        wait = self.timeout if timeout is None else timeout
+        if self.wheel is not None:
+            self.wheel.schedule(wait, self._expire, ip, future)
+        else:
+            timer = threading.Timer(wait, self._expire, (ip, future))
+            timer.daemon = True
+            timer.start()
+        return future
+
+    def resolve(self, ip, payload):
+        """Hand a reply from `ip` to every request waiting on it."""
+        with self._cond:
+            futures = self._waiters.pop(ip, None)
+        if not futures:
+            return False
+        for future in futures:
+            if not future.done():
+                self.replies += 1
+                future.set_result(payload)
+        return True
+
+    def _discard(self, ip, future):
+        with self._cond:
+            futures = self._waiters.get(ip)
+            if futures and future in futures:
+                futures.remove(future)
+                if not futures:
+                    del self._waiters[ip]
+
+    def _expire(self, ip, future):
+        if future.done():
+            return
+        self._discard(ip, future)
+        if not future.done():
+            self.timeouts += 1
+            future.set_result(None)
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while self.running and not self._ready:
+                    self._cond.wait()
+                if not self._ready:
+                    return
+                ip = self._ready.popleft()
+                fn, args = self._queues[ip].popleft()
+
+            started = time.perf_counter()
+            try:
+                fn(*args)
+                self.completed += 1
+            except Exception as e:
+                self.failed += 1
+                LOGGER.debug(f"Dispatched send to {ip} failed: {e}")
+            if METRICS.enabled:
+                METRICS.observe('dispatch', time.perf_counter() - started)
+
+            with self._cond:
+                self._pending -= 1
+                if self._queues[ip]:
+                    # More work for this device: back of the line, behind the others
+                    self._ready.append(ip)
+                    self._cond.notify_all()
+                else:
+                    del self._queues[ip]
+                if not self._pending:
+                    self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'pending': self._pending,
+                'max_depth': self.max_depth,
+                'devices_queued': len(self._queues),
+                'awaiting_reply': sum(len(f) for f in self._waiters.values()),
+                'replies': self.replies,
+                'timeouts': self.timeouts,
+            }
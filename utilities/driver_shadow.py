@@ -0,0 +1,87 @@
+import threading
+import udi_interface
+
+LOGGER = udi_interface.LOGGER
+
+
+class DriverShadow:
+    """Publishes node driver values to Polyglot only when they change.
+
+    Keeps the last value published for each node/driver. `stage` queues only
+    real changes; everything staged during one receive cycle is published by
+    a single flush on the next wheel tick, so a burst of replies for the same
+    light collapses to its final state.
+
+    Usage:
+      shadow = DriverShadow(wheel)
+      shadow.stage(node, {'ST': 1, 'GV0': 80})
+      shadow.stats()
+    """
+
+    def __init__(self, wheel, delay: float = 0.0):
+        self.wheel = wheel
+        self.delay = delay
+        self._published = {}
+        self._pending = {}
+        self._timer = None
+        self._lock = threading.Lock()
+
+        self.published = 0
+        self.suppressed = 0
+        self.merged = 0
+
+    def stage(self, node, values: dict):
+        """Queue the drivers in `values` that differ from what was last published."""
+        with self._lock:
+            published = self._published.get(node.address, {})
+            entry = self._pending.get(node.address)
+            for driver, value in values.items():
+                if published.get(driver) == value:
+                    self.suppressed += 1
+                    if entry is not None and entry[1].pop(driver, None) is not None:
+                        self.merged += 1
+                    continue
+                if entry is None:
+                    entry = self._pending[node.address] = (node, {})
+                elif driver in entry[1]:
+                    self.merged += 1
+                entry[1][driver] = value
+            if entry is not None and not entry[1]:
+                del self._pending[node.address]
+            if self._pending and self._timer is None:
+                self._timer = self.wheel.schedule(self.delay, self.flush)
+
+    def flush(self):
+        with self._lock:
+            self.wheel.cancel(self._timer)
+            self._timer = None
+            pending, self._pending = self._pending, {}
+            for address, (node, values) in pending.items():
+                self._published.setdefault(address, {}).update(values)
+            self.published += sum(len(values) for _, values in pending.values())
+
+        for node, values in pending.values():
+            for driver, value in values.items():
+                try:
+                    node.setDriver(driver, value)
+                except Exception as e:
+                    LOGGER.error(f"Failed to set {driver} on {node.address}: {e}")
+
+    def get(self, address, driver, default=None):
+        with self._lock:
+            entry = self._pending.get(address)
+            if entry is not None and driver in entry[1]:
+                return entry[1][driver]
+            return self._published.get(address, {}).get(driver, default)
+
+    def forget(self, address):
+        with self._lock:
+            self._published.pop(address, None)
+            self._pending.pop(address, None)
+
+    def stats(self):
+        return {
+            'published': self.published,
+            'suppressed': self.suppressed,
+            'merged': self.merged,
+        }
@@ -0,0 +1,102 @@
+import socket
+import threading
+import time
+import udi_interface
+
+from . import govee_codec
+from .metrics import METRICS
+from .packet_log import PACKETS
+from .packet_trace import TRACE, TX
+from .mmsg import sendmmsg, HAVE_SENDMMSG
+
+LOGGER = udi_interface.LOGGER
+
+
+class FanoutResult:
+    """Outcome of one fan-out burst.
+
+    `completed` maps each target key to None on success or the send error.
+    `elapsed` is the wall time in seconds from first to last datagram.
+    """
+    __slots__ = ('completed', 'elapsed')
+
+    def __init__(self, completed, elapsed):
+        self.completed = completed
+        self.elapsed = elapsed
+
+    @property
+    def sent(self):
+        return sum(1 for err in self.completed.values() if err is None)
+
+    @property
+    def failed(self):
+        return {key: err for key, err in self.completed.items() if err is not None}
+
+    def __repr__(self):
+        return f"FanoutResult(sent={self.sent}, failed={len(self.failed)}, elapsed={self.elapsed * 1000:.2f}ms)"
+
+
+class FanoutSender:
+    """Sends one command to many devices in a single burst.
+
+    The payload is encoded once and the whole burst goes out through one
+    sendmmsg() call on a dedicated socket (a sendto() loop where sendmmsg is
+    unavailable), so group commands do not queue behind GoveeClient's lock
+    one device at a time.
+
+    Usage:
+      sender = FanoutSender()
+      result = sender.send({'msg': {...}}, {'light1': '192.168.1.50', ...})
+      sender.close()
+    """
+
+    def __init__(self, port: int = 4003):
+        self.port = port
+        self.sock = None
+        self._lock = threading.Lock()
+
+    def _ensure_socket(self):
+        if self.sock is None:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.sock.setblocking(False)
+
+    def send(self, payload, targets: dict, port: int | None = None, trace: bool = True):
+        """Send `payload` to every `targets` value (an IP); results use the keys.
+
+        `trace=False` keeps the burst out of the per-device packet history
+        (for sweeps to addresses that are mostly not lights).
+        """
+        message = govee_codec.encode(payload)
+        target_port = port or self.port
+        keys = list(targets)
+        addresses = [(targets[key], target_port) for key in keys]
+
+        with self._lock:
+            self._ensure_socket()
+            started = time.perf_counter()
+            errors = sendmmsg(self.sock, [message] * len(keys), addresses)
+            elapsed = time.perf_counter() - started
+
+        result = FanoutResult(dict(zip(keys, errors)), elapsed)
+        if METRICS.enabled:
+            METRICS.inc('packets_sent', govee_codec.command_of(message), len(keys))
+            METRICS.observe('fanout', elapsed)
+            for key, err in result.failed.items():
+                METRICS.inc('send_errors', targets[key])
+        if trace and PACKETS.history:
+            for ip, _ in addresses:
+                PACKETS.record('tx', ip, message)
+        if TRACE.active:
+            for address in addresses:
+                TRACE.record(TX, address, message)
+        PACKETS.debug(None, "Fan-out to %d devices (%s): %s", len(keys), 'sendmmsg' if HAVE_SENDMMSG else 'sendto', result)
+        return result
+
+    def close(self):
+        with self._lock:
+            if self.sock:
+                try:
+                    self.sock.close()
+                except Exception:
+                    pass
+                self.sock = None
@@ -0,0 +1,189 @@
+import socket
+import threading
+import time
+import udi_interface
+
+from . import govee_codec
+from .metrics import METRICS
+from .packet_log import PACKETS
+from .mmsg import sendmmsg
+
+LOGGER = udi_interface.LOGGER
+
+
+class FrameStreamer:
+    """Streams color frames to many lights at a fixed frame rate.
+
+    Callers hand over the latest frame per light with `submit()`; a pacing
+    thread sends whatever is pending once per tick in one sendmmsg() burst on
+    its own socket. A frame replaced before its tick is dropped as stale, as
+    is one older than `max_age` frames, so a slow producer never builds a
+    backlog. A frame is either one (r, g, b) tuple, sent as colorwc, or a list
+    of per-segment tuples, sent as a razer frame (segment mode is switched on
+    the first time a light gets one and off again by `release()`/`stop()`).
+
+    Usage:
+      streamer = FrameStreamer(fps=30)
+      streamer.start()
+      streamer.submit({'192.168.1.50': (255, 0, 0), '192.168.1.51': [(0, 0, 255)] * 10})
+      streamer.stop()
+    """
+
+    def __init__(self, fps: float = 30, port: int = 4003, max_age: float = 2):
+        self.port = port
+        self.max_age = max_age
+        self.period = 1.0 / fps
+
+        self.sock = None
+        self.running = False
+        self.thread = None
+        self._pending = {}
+        self._segmented = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+
+        self.ticks = 0
+        self.sent = 0
+        self.stale = 0
+        self.late = 0
+        self.errors = 0
+
+    @property
+    def fps(self):
+        return 1.0 / self.period
+
+    @fps.setter
+    def fps(self, value):
+        self.period = 1.0 / max(1.0, float(value))
+
+    def start(self):
+        if self.running:
+            return
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        try:
+            self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_TOS, 0xB8)
+        except OSError:
+            pass
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name='GoveeFrameStream')
+        self.thread.daemon = True
+        self.thread.start()
+
+    def submit(self, frames: dict):
+        """Queue the next frame for each light (ip -> color or list of colors)."""
+        now = time.monotonic()
+        with self._lock:
+            for ip, frame in frames.items():
+                if ip in self._pending:
+                    self.stale += 1
+                self._pending[ip] = (now, frame)
+        self._wake.set()
+
+    def release(self, ips=None):
+        """Take lights (default: all) out of segment mode and drop their pending frames."""
+        with self._lock:
+            targets = set(self._segmented if ips is None else ips)
+            for ip in targets:
+                self._pending.pop(ip, None)
+            targets &= self._segmented
+            self._segmented -= targets
+        if targets and self.sock:
+            targets = list(targets)
+            sendmmsg(self.sock, [govee_codec.RAZER_OFF] * len(targets), [(ip, self.port) for ip in targets])
+
+    def _run(self):
+        deadline = time.monotonic()
+        while self.running:
+            if not self._pending:
+                self._wake.clear()
+                if not self._pending:
+                    self._wake.wait()
+                    deadline = max(deadline, time.monotonic())
+                continue
+            delay = deadline - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self._tick()
+            deadline += self.period
+            behind = time.monotonic() - deadline
+            if behind > self.period:
+                # Skip the ticks we missed rather than bursting to catch up
+                missed = int(behind / self.period)
+                self.late += missed
+                deadline += missed * self.period
+
+    def _tick(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            messages, addresses = self._build(pending)
+        if not messages:
+            return
+        started = time.perf_counter()
+        errors = sendmmsg(self.sock, messages, addresses)
+        failed = sum(1 for err in errors if err is not None)
+        self.ticks += 1
+        self.sent += len(messages) - failed
+        self.errors += failed
+        if METRICS.enabled:
+            METRICS.inc('packets_sent', 'stream', len(messages) - failed)
+            METRICS.observe('stream_tick', time.perf_counter() - started)
+            if failed:
+                METRICS.inc('send_errors', 'stream', failed)
+
+    def _build(self, pending):
+        oldest = time.monotonic() - self.max_age * self.period
+        messages = []
+        addresses = []
+        for ip, (submitted, frame) in pending.items():
+            if submitted < oldest:
+                self.stale += 1
+                continue
+            address = (ip, self.port)
+            try:
+                if isinstance(frame, tuple):
+                    if ip in self._segmented:
+                        self._segmented.discard(ip)
+                        messages.append(govee_codec.RAZER_OFF)
+                        addresses.append(address)
+                    messages.append(govee_codec.colorwc(*frame))
+                else:
+                    if ip not in self._segmented:
+                        self._segmented.add(ip)
+                        messages.append(govee_codec.RAZER_ON)
+                        addresses.append(address)
+                    messages.append(govee_codec.razer_frame(frame))
+            except (TypeError, ValueError) as e:
+                PACKETS.debug(ip, "Bad frame for %s: %s", ip, e)
+                self.errors += 1
+                continue
+            addresses.append(address)
+
+        return messages, addresses
+
+    def stop(self):
+        self.running = False
+        self._wake.set()
+        if self.thread:
+            self.thread.join(timeout=2)
+            self.thread = None
+        self.release()
+        with self._lock:
+            self._pending.clear()
+        if self.sock:
+            try:
+                self.sock.close()
+            except Exception:
+                pass
+            self.sock = None
+
+    def stats(self):
+        return {
+            'fps': round(self.fps, 1),
+            'ticks': self.ticks,
+            'sent': self.sent,
+            'stale': self.stale,
+            'late': self.late,
+            'errors': self.errors,
+            'segmented': len(self._segmented),
+        }
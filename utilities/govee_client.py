@@ -3,9 +3,21 @@ import json
 import threading
 import udi_interface
 
+from . import govee_codec
+from .metrics import METRICS
+from .packet_log import PACKETS
+from .packet_trace import TRACE, RX, TX
+
 LOGGER = udi_interface.LOGGER
 
 
+def _record_send(ip, message):
+    cmd = govee_codec.command_of(message)
+    METRICS.inc('packets_sent', cmd)
+    if cmd == 'devStatus':
+        METRICS.request_sent(ip)
+
+
 class GoveeClient:
     """Simple UDP client for sending requests to a single device IP.
 
@@ -30,14 +42,19 @@ class GoveeClient:
             self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
             self.sock.settimeout(self.timeout)
 
-    def send_request(self, ip: str, payload: dict, port: int | None = None, expect_response: bool = False):
-        """Send a JSON payload (dict) to `ip:port` via UDP.
+    def send_request(self, ip: str, payload: dict | bytes, port: int | None = None, expect_response: bool = False):
+        """Send a JSON payload (dict, or pre-encoded bytes from govee_codec) to `ip:port` via UDP.
 
         If `expect_response` is True, attempts to receive a response from the same socket.
         Returns parsed JSON response or None on timeout/no-response.
         """
         target_port = port or self.port
-        message = json.dumps(payload).encode('utf-8')
+        message = govee_codec.encode(payload)
+        if METRICS.enabled:
+            _record_send(ip, message)
+        PACKETS.record('tx', ip, message)
+        if TRACE.active:
+            TRACE.record(TX, (ip, target_port), message)
 
         if expect_response:
             with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as tsock:
@@ -45,10 +62,15 @@ class GoveeClient:
                 try:
                     tsock.sendto(message, (ip, target_port))
                 except Exception as e:
-                    LOGGER.debug(f"Error sending (expect_response) to {ip}:{target_port}: {e}")
+                    PACKETS.debug(ip, "Error sending (expect_response) to %s:%s: %s", ip, target_port, e)
+                    if METRICS.enabled:
+                        METRICS.inc('send_errors', ip)
                     raise
                 try:
                     data, addr = tsock.recvfrom(4096)
+                    PACKETS.record('rx', addr[0], data)
+                    if TRACE.active:
+                        TRACE.record(RX, addr, data)
                     return json.loads(data.decode('utf-8'))
                 except socket.timeout:
                     return None
@@ -60,7 +82,9 @@ class GoveeClient:
                 try:
                     self.sock.sendto(message, (ip, target_port))
                 except Exception as e:
-                    LOGGER.debug(f"Error sending to {ip}:{target_port}: {e}")
+                    PACKETS.debug(ip, "Error sending to %s:%s: %s", ip, target_port, e)
+                    if METRICS.enabled:
+                        METRICS.inc('send_errors', ip)
                     raise
             return None
         else:
@@ -78,14 +102,20 @@ class GoveeClient:
                 pass
             self.sock = None
 
-    def send_multicast(self, payload: dict, multicast_group: str = '239.255.255.250', port: int = 4001, ttl: int = 2):
+    def send_multicast(self, payload: dict | bytes, multicast_group: str = '239.255.255.250', port: int = 4001, ttl: int = 2,
+                       interfaces: list | None = None):
         """Send a JSON payload to a multicast group/port.
 
         This method will set the multicast TTL appropriately. It uses the
         client's reusable socket if `reuse=True`, otherwise creates a
-        short-lived socket for the multicast send.
+        short-lived socket for the multicast send. With `interfaces` (local
+        IPv4 addresses) one copy goes out of each interface; otherwise the
+        kernel picks the route.
         """
-        message = json.dumps(payload).encode('utf-8')
+        message = govee_codec.encode(payload)
+        PACKETS.record('tx', multicast_group, message)
+        if TRACE.active:
+            TRACE.record(TX, (multicast_group, port), message)
 
         if self.reuse:
             self._ensure_socket()
@@ -96,28 +126,43 @@ class GoveeClient:
                 except Exception:
                     # not fatal; continue to send
                     pass
-                try:
-                    self.sock.sendto(message, (multicast_group, port))
-                except Exception as e:
-                    LOGGER.debug(f"Error sending multicast to {multicast_group}:{port}: {e}")
-                    raise
+                self._send_multicast(self.sock, message, multicast_group, port, interfaces)
         else:
             with socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP) as msock:
                 try:
                     msock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, ttl)
                 except Exception:
                     pass
-                msock.sendto(message, (multicast_group, port))
+                self._send_multicast(msock, message, multicast_group, port, interfaces)
 
-
-def send_to_device(ip: str, payload: dict, port: int = 4003, timeout: float = 2.0):
+    def _send_multicast(self, sock, message, multicast_group, port, interfaces):
+        error = None
+        sent = 0
+        for interface in interfaces or [None]:
+            try:
+                if interface is not None:
+                    sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(interface))
+                sock.sendto(message, (multicast_group, port))
+                sent += 1
+                if METRICS.enabled:
+                    METRICS.inc('packets_sent', govee_codec.command_of(message))
+            except Exception as e:
+                LOGGER.debug(f"Error sending multicast to {multicast_group}:{port} via {interface or 'default route'}: {e}")
+                if METRICS.enabled:
+                    METRICS.inc('send_errors', interface or multicast_group)
+                error = e
+        if not sent and error is not None:
+            raise error
+
+
+def send_to_device(ip: str, payload: dict | bytes, port: int = 4003, timeout: float = 2.0):
     """Convenience function to send a single request and get optional response.
 
     This creates a short-lived socket (no fd reuse required).
     """
     with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
         s.settimeout(timeout)
-        s.sendto(json.dumps(payload).encode('utf-8'), (ip, port))
+        s.sendto(govee_codec.encode(payload), (ip, port))
         try:
             data, addr = s.recvfrom(4096)
             return json.loads(data.decode('utf-8'))
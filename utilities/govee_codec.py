@@ -0,0 +1,86 @@
+import base64
+import json
+
+# Pre-encoded Govee LAN API messages. The discovery and on/off messages
+# never change, so they are kept as interned bytes. Parameterized messages
+# are filled into byte templates with %-formatting, which skips the generic
+# JSON encoder entirely. Anything else still goes through encode().
+
+SCAN = b'{"msg":{"cmd":"scan","data":{"account_topic":"reserve"}}}'
+DEV_STATUS = b'{"msg":{"cmd":"devStatus","data":{}}}'
+TURN_ON = b'{"msg":{"cmd":"turn","data":{"value":1}}}'
+TURN_OFF = b'{"msg":{"cmd":"turn","data":{"value":0}}}'
+
+_BRIGHTNESS = b'{"msg":{"cmd":"brightness","data":{"value":%d}}}'
+_COLORWC = b'{"msg":{"cmd":"colorwc","data":{"color":{"r":%d,"g":%d,"b":%d},"colorTemInKelvin":%d}}}'
+
+# Brightness only takes 0-100, so every possible message is built up front
+_BRIGHTNESS_TABLE = tuple(_BRIGHTNESS % value for value in range(101))
+_COLOR_TEMP_CACHE = {}
+
+
+def _clamp(value, low, high):
+    return low if value < low else high if value > high else value
+
+
+def turn(on) -> bytes:
+    return TURN_ON if on else TURN_OFF
+
+
+def brightness(value) -> bytes:
+    return _BRIGHTNESS_TABLE[_clamp(int(value), 0, 100)]
+
+
+def color_temp(kelvin) -> bytes:
+    """White at the given color temperature (colorwc with r/g/b zeroed)."""
+    kelvin = int(kelvin)
+    message = _COLOR_TEMP_CACHE.get(kelvin)
+    if message is None:
+        message = _COLORWC % (0, 0, 0, kelvin)
+        if len(_COLOR_TEMP_CACHE) < 1024:
+            _COLOR_TEMP_CACHE[kelvin] = message
+    return message
+
+
+def colorwc(r, g, b, kelvin=0) -> bytes:
+    return _COLORWC % (_clamp(int(r), 0, 255), _clamp(int(g), 0, 255), _clamp(int(b), 0, 255), int(kelvin))
+
+
+# Segment ("razer") streaming: raw BB-framed packets, base64 encoded in "pt"
+_RAZER = b'{"msg":{"cmd":"razer","data":{"pt":"%s"}}}'
+RAZER_ON = _RAZER % base64.b64encode(bytes((0xBB, 0x00, 0x01, 0xB1, 0x01, 0x0A)))
+RAZER_OFF = _RAZER % base64.b64encode(bytes((0xBB, 0x00, 0x01, 0xB1, 0x00, 0x0B)))
+
+
+def razer_frame(colors) -> bytes:
+    """One segment frame from a sequence of (r, g, b) tuples, first segment first."""
+    count = len(colors)
+    if count > 84:
+        raise ValueError(f"Too many segments for one frame: {count}")
+    packet = bytearray((0xBB, 0x00, 3 * count + 2, 0xB0, 0x01, count))
+    for r, g, b in colors:
+        packet += bytes((_clamp(int(r), 0, 255), _clamp(int(g), 0, 255), _clamp(int(b), 0, 255)))
+    checksum = 0
+    for byte in packet:
+        checksum ^= byte
+    packet.append(checksum)
+    return _RAZER % base64.b64encode(packet)
+
+
+_CMD_PREFIX = b'{"msg":{"cmd":"'
+
+
+def command_of(message: bytes) -> str:
+    """The `cmd` of an encoded message, read from its prefix without parsing."""
+    if message.startswith(_CMD_PREFIX):
+        end = message.find(b'"', len(_CMD_PREFIX))
+        if end > 0:
+            return message[len(_CMD_PREFIX):end].decode('ascii', 'replace')
+    return 'other'
+
+
+def encode(payload) -> bytes:
+    """Return the wire bytes for `payload`; bytes pass through untouched."""
+    if isinstance(payload, bytes):
+        return payload
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
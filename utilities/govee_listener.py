@@ -1,8 +1,16 @@
 import udi_interface
 import socket
 import struct
-import json
+import queue
+import select
 import threading
+import time
+
+from .metrics import METRICS
+from . import packet_decoder
+from .mmsg import RecvBatch
+from .packet_log import PACKETS
+from .packet_trace import TRACE, RX
 
 LOGGER = udi_interface.LOGGER
 
@@ -10,54 +18,216 @@ LOGGER = udi_interface.LOGGER
 class GoveeListener:
     """Listens for UDP/multicast responses and calls a callback with (response, address).
 
+    The receive thread only drains the socket, in batches into preallocated
+    buffers, and hands raw datagrams to a bounded queue. A worker thread
+    decodes them and runs the callback, so slow callbacks (node creation,
+    setDriver) no longer stall the socket during a scan burst. When the
+    queue is full, `overflow` decides what is lost: 'drop_oldest' (default),
+    'drop_newest', or 'block' (back-pressure onto the kernel buffer).
+
+    The multicast group is joined on every address in `interfaces` (or on
+    INADDR_ANY when empty). A light reachable over several interfaces, or
+    hit by both a multicast scan and a unicast sweep, answers more than
+    once; identical `scan` replies from the same address within
+    `dedupe_window` seconds are dropped before decoding. Status replies are
+    never deduplicated: an unchanged light answers every devStatus poll
+    with the same bytes, and each of those answers is wanted.
+
+    Datagrams that cannot be Govee JSON (SSDP on the same group) are
+    rejected from their first byte. The rest go through `decoder`
+    (default: the fastest JSON backend, giving dicts; the controller passes
+    `packet_decoder.decode` to get typed reply records).
+
     Example:
         listener = GoveeListener(multicastGroup, receivePort)
         listener.start(callback=cb)
         ...
+        listener.stats()
         listener.stop()
     """
-    def __init__(self, multicastGroup='239.255.255.250', receivePort=4002, timeout=1.0):
+    OVERFLOW_POLICIES = ('drop_oldest', 'drop_newest', 'block')
+
+    def __init__(self, multicastGroup='239.255.255.250', receivePort=4002, timeout=1.0,
+                 batch_size=64, queue_size=4096, overflow='drop_oldest', rcvbuf=1 << 20,
+                 interfaces=None, dedupe_window=1.0, decoder=None):
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
         self.multicastGroup = multicastGroup
         self.receivePort = receivePort
         self.timeout = timeout
+        self.batch_size = batch_size
+        self.overflow = overflow
+        self.rcvbuf = rcvbuf
+        self.interfaces = list(interfaces or [])
+        self.dedupe_window = dedupe_window
+        self.decoder = decoder or packet_decoder.loads
+        self._joined = []
+        self._recent = {}
+        self._recent_pruned = 0.0
 
         self.sock = None
         self.running = False
         self.thread = None
+        self.worker = None
+        self.queue = queue.Queue(maxsize=queue_size)
+
+        self.received = 0
+        self.batches = 0
+        self.dropped = 0
+        self.decode_failures = 0
+        self.callback_errors = 0
+        self.max_depth = 0
+        self.duplicates = 0
+        self.foreign = 0
 
     def _setup_socket(self):
         if self.sock:
             return
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
         self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.rcvbuf)
+        except OSError as e:
+            LOGGER.debug(f"Could not set SO_RCVBUF to {self.rcvbuf}: {e}")
         self.sock.bind(('', self.receivePort))
-        mreq = struct.pack('4sL', socket.inet_aton(self.multicastGroup), socket.INADDR_ANY)
-        self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
-        self.sock.settimeout(self.timeout)
+        self._join(self.interfaces)
+        self.sock.setblocking(False)
+
+    def _membership(self, interface):
+        group = socket.inet_aton(self.multicastGroup)
+        if interface is None:
+            return struct.pack('4sL', group, socket.INADDR_ANY)
+        return struct.pack('4s4s', group, socket.inet_aton(interface))
+
+    def _join(self, interfaces):
+        for interface in interfaces or [None]:
+            try:
+                self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, self._membership(interface))
+                self._joined.append(interface)
+            except OSError as e:
+                LOGGER.error(f"Could not join {self.multicastGroup} on {interface or 'default interface'}: {e}")
+
+    def set_interfaces(self, interfaces):
+        """Re-join the multicast group on a new interface list (live if bound)."""
+        interfaces = list(interfaces or [])
+        if interfaces == self.interfaces:
+            return
+        self.interfaces = interfaces
+        if self.sock is None:
+            return
+        for interface in self._joined:
+            try:
+                self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_DROP_MEMBERSHIP, self._membership(interface))
+            except OSError:
+                pass
+        self._joined = []
+        self._join(interfaces)
+
+    def _duplicate(self, ip, data, now):
+        key = (ip, data)
+        seen = self._recent.get(key)
+        if seen is not None and now - seen < self.dedupe_window:
+            return True
+        self._recent[key] = now
+        if now - self._recent_pruned > self.dedupe_window:
+            cutoff = now - self.dedupe_window
+            self._recent = {k: t for k, t in self._recent.items() if t >= cutoff}
+            self._recent_pruned = now
+        return False
 
-    def _listen_loop(self, callback):
+    def _enqueue(self, item):
+        if self.overflow == 'block':
+            self.queue.put(item)
+            return
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+            if self.overflow == 'drop_newest':
+                return
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                self.queue.put_nowait(item)
+            except queue.Full:
+                self.dropped += 1
+
+    def _listen_loop(self):
         LOGGER.debug(f"GoveeListener listening on port {self.receivePort}")
+        batch = RecvBatch(self.batch_size)
         while self.running:
             try:
-                data, addr = self.sock.recvfrom(4096)
-                try:
-                    payload = json.loads(data.decode('utf-8'))
-                except Exception as e:
-                    LOGGER.debug(f"Failed to decode JSON from {addr}: {e}")
+                readable, _, _ = select.select([self.sock], [], [], self.timeout)
+                if not readable:
                     continue
-                try:
-                    callback(payload, addr)
-                except Exception as e:
-                    LOGGER.debug(f"Listener callback error: {e}")
-            except socket.timeout:
-                continue
+                while self.running:
+                    datagrams = batch.recv(self.sock)
+                    if not datagrams:
+                        break
+                    self.batches += 1
+                    self.received += len(datagrams)
+                    if TRACE.active:
+                        for data, addr in datagrams:
+                            TRACE.record(RX, addr, data)
+                    for item in datagrams:
+                        self._enqueue(item)
+                    depth = self.queue.qsize()
+                    if depth > self.max_depth:
+                        self.max_depth = depth
+                    if len(datagrams) < self.batch_size:
+                        break
             except Exception as e:
-                LOGGER.debug(f"GoveeListener receive error: {e}")
+                if self.running:
+                    LOGGER.debug(f"GoveeListener receive error: {e}")
+
+    def _worker_loop(self, callback):
+        handle = self.handle
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            handle(item[0], item[1], callback)
+
+    def handle(self, data, addr, callback, now=None):
+        """Filter, decode and deliver one datagram as the worker thread does.
+
+        Also used to replay a packet trace through the pipeline without a
+        socket; `now` (monotonic seconds, default the current time) then
+        carries the recorded arrival time so dedupe sees the captured gaps.
+        """
+        if packet_decoder.is_foreign(data):
+            self.foreign += 1
+            return
+        if self.dedupe_window and packet_decoder.is_scan(data) and self._duplicate(addr[0], data, time.monotonic() if now is None else now):
+            self.duplicates += 1
+            return
+        PACKETS.record('rx', addr[0], data)
+        try:
+            payload = self.decoder(data)
+        except Exception as e:
+            payload = None
+            PACKETS.debug(addr[0], "Failed to decode JSON from %s: %s", addr, e)
+        if payload is None:
+            self.decode_failures += 1
+            return
+        started = time.perf_counter() if METRICS.enabled else None
+        try:
+            callback(payload, addr)
+        except Exception as e:
+            self.callback_errors += 1
+            PACKETS.debug(addr[0], "Listener callback error: %s", e)
+        if started is not None:
+            METRICS.observe('callback', time.perf_counter() - started)
 
     def start(self, callback):
         self._setup_socket()
         self.running = True
-        self.thread = threading.Thread(target=self._listen_loop, args=(callback,))
+        self.worker = threading.Thread(target=self._worker_loop, args=(callback,), name='GoveeWorker')
+        self.worker.daemon = True
+        self.worker.start()
+        self.thread = threading.Thread(target=self._listen_loop, name='GoveeListener')
         self.thread.daemon = True
         self.thread.start()
 
@@ -65,9 +235,29 @@ class GoveeListener:
         self.running = False
         if self.thread:
             self.thread.join(timeout=2)
+        if self.worker:
+            try:
+                self.queue.put(None, timeout=1)
+            except queue.Full:
+                pass
+            self.worker.join(timeout=2)
         if self.sock:
             try:
                 self.sock.close()
             except Exception:
                 pass
             self.sock = None
+            self._joined = []
+
+    def stats(self):
+        return {
+            'received': self.received,
+            'batches': self.batches,
+            'dropped': self.dropped,
+            'duplicates': self.duplicates,
+            'foreign': self.foreign,
+            'decode_failures': self.decode_failures,
+            'callback_errors': self.callback_errors,
+            'queue_depth': self.queue.qsize(),
+            'max_depth': self.max_depth,
+        }
@@ -0,0 +1,163 @@
+import threading
+import time
+import udi_interface
+
+from . import govee_codec
+
+LOGGER = udi_interface.LOGGER
+
+
+class _Liveness:
+    __slots__ = ('last_seen', 'failures', 'alive', 'blocked')
+
+    def __init__(self, last_seen):
+        self.last_seen = last_seen
+        self.failures = 0
+        self.alive = None
+        self.blocked = 0
+
+
+class LivenessTracker:
+    """Per-device liveness with a circuit breaker.
+
+    Any reply from a light (`seen`) marks it alive. Missed polls and failed
+    sends (`failed`) count against it; once it has `threshold` failures in a
+    row and nothing was heard for `dead_after` seconds the breaker opens:
+    `allow()` turns False so commands and polls are not sent, and the light
+    is probed with devStatus every `probe_interval` seconds instead. The
+    first reply closes the breaker again. `on_change(ip, alive)` is called on
+    every transition.
+
+    Usage:
+      liveness = LivenessTracker(send_fn, wheel, on_change=cb)
+      liveness.start()
+      liveness.add('192.168.1.50')
+      liveness.seen('192.168.1.50')
+      if liveness.allow('192.168.1.50'): ...
+    """
+
+    def __init__(self, send_fn, wheel, dead_after: float = 90.0, threshold: int = 3,
+                 probe_interval: float = 60.0, on_change=None):
+        self._send = send_fn
+        self.wheel = wheel
+        self.dead_after = dead_after
+        self.threshold = threshold
+        self.probe_interval = probe_interval
+        self.on_change = on_change
+
+        self._devices = {}
+        self._lock = threading.Lock()
+        self._timer = None
+        self._running = False
+
+        self.tripped = 0
+        self.restored = 0
+        self.probes = 0
+
+    def start(self):
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            self._timer = self.wheel.schedule(self.probe_interval, self._probe)
+
+    def stop(self):
+        with self._lock:
+            self._running = False
+            self.wheel.cancel(self._timer)
+            self._timer = None
+
+    def add(self, ip):
+        """Track `ip`; it gets a full `dead_after` grace period before it can trip."""
+        if not ip:
+            return
+        with self._lock:
+            self._devices.setdefault(ip, _Liveness(time.monotonic()))
+
+    def remove(self, ip):
+        with self._lock:
+            self._devices.pop(ip, None)
+
+    def move(self, old_ip, new_ip):
+        with self._lock:
+            entry = self._devices.pop(old_ip, None)
+            if entry is not None and new_ip:
+                self._devices[new_ip] = entry
+
+    def seen(self, ip):
+        """Any reply from `ip` proves it is alive."""
+        with self._lock:
+            entry = self._devices.get(ip)
+            if entry is None:
+                return
+            entry.last_seen = time.monotonic()
+            entry.failures = 0
+            if entry.alive:
+                return
+            restored = entry.alive is False
+            entry.alive = True
+            if restored:
+                self.restored += 1
+        if restored:
+            LOGGER.info(f"Device at {ip} is reachable again")
+        self._notify(ip, True)
+
+    def failed(self, ip):
+        """A poll went unanswered or a send failed."""
+        with self._lock:
+            entry = self._devices.get(ip)
+            if entry is None or entry.alive is False:
+                return
+            entry.failures += 1
+            if entry.failures < self.threshold or time.monotonic() - entry.last_seen < self.dead_after:
+                return
+            entry.alive = False
+            self.tripped += 1
+        LOGGER.info(f"Device at {ip} is unreachable; holding sends until it answers a probe")
+        self._notify(ip, False)
+
+    def allow(self, ip):
+        """False while the breaker for `ip` is open."""
+        entry = self._devices.get(ip)
+        if entry is None or entry.alive is not False:
+            return True
+        entry.blocked += 1
+        return False
+
+    def is_alive(self, ip):
+        entry = self._devices.get(ip)
+        return bool(entry and entry.alive)
+
+    def _notify(self, ip, alive):
+        if self.on_change is None:
+            return
+        try:
+            self.on_change(ip, alive)
+        except Exception as e:
+            LOGGER.error(f"Liveness callback for {ip} failed: {e}")
+
+    def _probe(self):
+        with self._lock:
+            if not self._running:
+                return
+            dead = [ip for ip, entry in self._devices.items() if entry.alive is False]
+            self._timer = self.wheel.schedule(self.probe_interval, self._probe)
+        for ip in dead:
+            self.probes += 1
+            try:
+                self._send(ip, govee_codec.DEV_STATUS)
+            except Exception as e:
+                LOGGER.debug(f"Probe to {ip} failed: {e}")
+
+    def stats(self):
+        with self._lock:
+            entries = list(self._devices.values())
+        return {
+            'devices': len(entries),
+            'alive': sum(1 for e in entries if e.alive),
+            'dead': sum(1 for e in entries if e.alive is False),
+            'blocked': sum(e.blocked for e in entries),
+            'tripped': self.tripped,
+            'restored': self.restored,
+            'probes': self.probes,
+        }
@@ -0,0 +1,141 @@
+import bisect
+import json
+import threading
+import time
+
+
+class Histogram:
+    """Fixed-bucket latency histogram in milliseconds."""
+    BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+    __slots__ = ('counts', 'count', 'total_ms', 'max_ms')
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms):
+        self.counts[bisect.bisect_left(self.BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, pct):
+        """Upper bound of the bucket holding the `pct` percentile."""
+        if not self.count:
+            return None
+        rank = pct / 100 * self.count
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return self.BOUNDS_MS[index] if index < len(self.BOUNDS_MS) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self):
+        labels = [f"<={b}" for b in self.BOUNDS_MS] + [f">{self.BOUNDS_MS[-1]}"]
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total_ms / self.count, 3) if self.count else None,
+            'p50_ms': self.percentile(50),
+            'p99_ms': self.percentile(99),
+            'max_ms': round(self.max_ms, 3),
+            'buckets': {label: n for label, n in zip(labels, self.counts) if n},
+        }
+
+
+class Metrics:
+    """Process-wide counters, latency histograms and stats sources.
+
+    Hot paths check `METRICS.enabled` before calling in, so a disabled
+    registry costs one attribute read per packet.
+
+    Usage:
+      if METRICS.enabled:
+          METRICS.inc('packets_sent', 'devStatus')
+          METRICS.observe('callback', seconds)
+      METRICS.register('listener', listener.stats)
+      METRICS.dump()
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.started = time.time()
+        self._counters = {}
+        self._histograms = {}
+        self._sources = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name, key='total', amount=1):
+        with self._lock:
+            counter = self._counters.get(name)
+            if counter is None:
+                counter = self._counters[name] = {}
+            counter[key] = counter.get(key, 0) + amount
+
+    def observe(self, name, seconds, key=None):
+        with self._lock:
+            histogram = self._histograms.get((name, key))
+            if histogram is None:
+                histogram = self._histograms[(name, key)] = Histogram()
+            histogram.observe(seconds * 1000)
+
+    def request_sent(self, ip):
+        """Note a devStatus request so the matching reply yields a round-trip time."""
+        self._inflight[ip] = time.monotonic()
+
+    def reply_received(self, ip, max_age: float = 5.0):
+        sent = self._inflight.pop(ip, None)
+        if sent is None:
+            return
+        elapsed = time.monotonic() - sent
+        if elapsed <= max_age:
+            self.observe('rtt', elapsed, ip)
+            self.observe('rtt', elapsed)
+
+    def total(self, name):
+        with self._lock:
+            return sum(self._counters.get(name, {}).values())
+
+    def register(self, name, fn):
+        """Include `fn()` (a dict of stats) under `name` in every snapshot."""
+        self._sources[name] = fn
+
+    def snapshot(self):
+        with self._lock:
+            counters = {name: dict(values) for name, values in self._counters.items()}
+            histograms = {}
+            for (name, key), histogram in self._histograms.items():
+                if key is None:
+                    histograms.setdefault(name, {})['all'] = histogram.snapshot()
+                else:
+                    histograms.setdefault(name, {})[key] = histogram.snapshot()
+        sources = {}
+        for name, fn in list(self._sources.items()):
+            try:
+                sources[name] = fn()
+            except Exception as e:
+                sources[name] = {'error': str(e)}
+        return {
+            'enabled': self.enabled,
+            'uptime_s': round(time.time() - self.started),
+            'counters': counters,
+            'histograms': histograms,
+            'sources': sources,
+        }
+
+    def dump(self):
+        return json.dumps(self.snapshot(), default=str)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self._inflight.clear()
+            self.started = time.time()
+
+
+METRICS = Metrics()
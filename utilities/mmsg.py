@@ -0,0 +1,183 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import socket
+import struct
+import udi_interface
+
+LOGGER = udi_interface.LOGGER
+
+# Thin ctypes bindings for Linux sendmmsg(2)/recvmmsg(2), used to move a
+# burst of datagrams with one syscall. HAVE_SENDMMSG/HAVE_RECVMMSG are False
+# on other platforms and callers fall back to sendto()/recvfrom_into() loops.
+
+
+class _IOVec(ctypes.Structure):
+    _fields_ = [('iov_base', ctypes.c_void_p), ('iov_len', ctypes.c_size_t)]
+
+
+class _MsgHdr(ctypes.Structure):
+    _fields_ = [
+        ('msg_name', ctypes.c_void_p),
+        ('msg_namelen', ctypes.c_uint32),
+        ('msg_iov', ctypes.POINTER(_IOVec)),
+        ('msg_iovlen', ctypes.c_size_t),
+        ('msg_control', ctypes.c_void_p),
+        ('msg_controllen', ctypes.c_size_t),
+        ('msg_flags', ctypes.c_int),
+    ]
+
+
+class _MMsgHdr(ctypes.Structure):
+    _fields_ = [('msg_hdr', _MsgHdr), ('msg_len', ctypes.c_uint)]
+
+
+_SOCKADDR_IN = struct.Struct('=H2s4s8x')
+
+
+def _load_libc():
+    if not os.uname().sysname == 'Linux':
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        libc.sendmmsg.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int]
+        libc.sendmmsg.restype = ctypes.c_int
+        libc.recvmmsg.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int, ctypes.c_void_p]
+        libc.recvmmsg.restype = ctypes.c_int
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+_libc = _load_libc()
+HAVE_SENDMMSG = _libc is not None
+HAVE_RECVMMSG = _libc is not None
+
+_MSG_DONTWAIT = getattr(socket, 'MSG_DONTWAIT', 0x40)
+
+
+def sockaddr_in(ip: str, port: int) -> bytes:
+    return _SOCKADDR_IN.pack(socket.AF_INET, struct.pack('!H', port), socket.inet_aton(ip))
+
+
+def sendmmsg(sock, messages, addresses):
+    """Send `messages[i]` to `addresses[i]` (ip, port) on `sock`.
+
+    Returns a list with None for each datagram handed to the kernel, or the
+    OSError that prevented it from being sent.
+    """
+    count = len(messages)
+    results = [None] * count
+    if not HAVE_SENDMMSG:
+        for i in range(count):
+            try:
+                sock.sendto(messages[i], addresses[i])
+            except OSError as e:
+                results[i] = e
+        return results
+
+    # Keep every buffer referenced until the syscall returns
+    names = [ctypes.create_string_buffer(sockaddr_in(*addr), _SOCKADDR_IN.size) for addr in addresses]
+    bodies = [ctypes.create_string_buffer(msg, len(msg)) for msg in messages]
+    iovecs = (_IOVec * count)()
+    headers = (_MMsgHdr * count)()
+    for i in range(count):
+        iovecs[i].iov_base = ctypes.cast(bodies[i], ctypes.c_void_p)
+        iovecs[i].iov_len = len(messages[i])
+        hdr = headers[i].msg_hdr
+        hdr.msg_name = ctypes.cast(names[i], ctypes.c_void_p)
+        hdr.msg_namelen = _SOCKADDR_IN.size
+        hdr.msg_iov = ctypes.pointer(iovecs[i])
+        hdr.msg_iovlen = 1
+
+    fd = sock.fileno()
+    base = ctypes.addressof(headers)
+    index = 0
+    while index < count:
+        sent = _libc.sendmmsg(fd, base + index * ctypes.sizeof(_MMsgHdr), count - index, 0)
+        if sent > 0:
+            index += sent
+            continue
+        err = ctypes.get_errno()
+        if err == errno.EINTR:
+            continue
+        if err in (errno.EAGAIN, errno.ENOBUFS):
+            # Socket buffer is full; finish this burst the slow way
+            for i in range(index, count):
+                try:
+                    sock.sendto(messages[i], addresses[i])
+                except OSError as e:
+                    results[i] = e
+            return results
+        # The datagram at `index` was rejected (e.g. unreachable); skip it
+        results[index] = OSError(err, os.strerror(err))
+        index += 1
+    return results
+
+
+class RecvBatch:
+    """Preallocated buffers for draining up to `size` datagrams per call.
+
+    Usage:
+      batch = RecvBatch(size=64)
+      for data, addr in batch.recv(sock):
+          ...
+    """
+
+    def __init__(self, size: int = 64, bufsize: int = 4096):
+        self.size = size
+        self.bufsize = bufsize
+        self._buffer = ctypes.create_string_buffer(size * bufsize)
+        if HAVE_RECVMMSG:
+            self._names = ctypes.create_string_buffer(size * _SOCKADDR_IN.size)
+            self._iovecs = (_IOVec * size)()
+            self._headers = (_MMsgHdr * size)()
+            base = ctypes.addressof(self._buffer)
+            names = ctypes.addressof(self._names)
+            for i in range(size):
+                self._iovecs[i].iov_base = base + i * bufsize
+                self._iovecs[i].iov_len = bufsize
+                hdr = self._headers[i].msg_hdr
+                hdr.msg_name = names + i * _SOCKADDR_IN.size
+                hdr.msg_iov = ctypes.pointer(self._iovecs[i])
+                hdr.msg_iovlen = 1
+        else:
+            self._view = memoryview(bytearray(bufsize))
+
+    def recv(self, sock):
+        """Return the datagrams waiting on `sock` (at most `size`) without blocking."""
+        if not HAVE_RECVMMSG:
+            return self._recv_loop(sock)
+        for i in range(self.size):
+            self._headers[i].msg_hdr.msg_namelen = _SOCKADDR_IN.size
+        while True:
+            count = _libc.recvmmsg(sock.fileno(), ctypes.addressof(self._headers), self.size, _MSG_DONTWAIT, None)
+            if count >= 0:
+                break
+            err = ctypes.get_errno()
+            if err == errno.EINTR:
+                continue
+            if err in (errno.EAGAIN, errno.EWOULDBLOCK):
+                return []
+            raise OSError(err, os.strerror(err))
+
+        base = ctypes.addressof(self._buffer)
+        raw_names = self._names.raw
+        out = []
+        for i in range(count):
+            length = self._headers[i].msg_len
+            _, port, ip = _SOCKADDR_IN.unpack_from(raw_names, i * _SOCKADDR_IN.size)
+            out.append((ctypes.string_at(base + i * self.bufsize, length),
+                        (socket.inet_ntoa(ip), struct.unpack('!H', port)[0])))
+        return out
+
+    def _recv_loop(self, sock):
+        out = []
+        for _ in range(self.size):
+            try:
+                length, addr = sock.recvfrom_into(self._view, self.bufsize, _MSG_DONTWAIT)
+            except (BlockingIOError, InterruptedError):
+                break
+            out.append((bytes(self._view[:length]), addr))
+        return out
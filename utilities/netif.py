@@ -0,0 +1,70 @@
+import ipaddress
+import socket
+import struct
+import udi_interface
+
+LOGGER = udi_interface.LOGGER
+
+SIOCGIFADDR = 0x8915
+
+
+def interface_address(name):
+    """IPv4 address of a local interface given by name (Linux) or address."""
+    try:
+        return str(ipaddress.IPv4Address(name))
+    except ValueError:
+        pass
+    try:
+        import fcntl
+    except ImportError:
+        raise ValueError(f"Cannot resolve interface name {name} on this platform")
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        try:
+            packed = fcntl.ioctl(sock.fileno(), SIOCGIFADDR, struct.pack('256s', name.encode()[:15]))
+        except OSError as e:
+            raise ValueError(f"No IPv4 address on interface {name}: {e}")
+    return socket.inet_ntoa(packed[20:24])
+
+
+def parse_interfaces(spec):
+    """Interface addresses from a comma separated list of names and/or IPs.
+
+    Entries that cannot be resolved are logged and skipped.
+    """
+    addresses = []
+    for item in (spec or '').split(','):
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            address = interface_address(item)
+        except ValueError as e:
+            LOGGER.error(f"Ignoring interface {item}: {e}")
+            continue
+        if address not in addresses:
+            addresses.append(address)
+    return addresses
+
+
+def subnet_hosts(spec, limit: int = 4096):
+    """Host addresses for a comma separated list of CIDR subnets, capped at `limit`."""
+    hosts = []
+    seen = set()
+    for item in (spec or '').split(','):
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            network = ipaddress.IPv4Network(item, strict=False)
+        except ValueError as e:
+            LOGGER.error(f"Ignoring subnet {item}: {e}")
+            continue
+        for host in network.hosts():
+            if len(hosts) >= limit:
+                LOGGER.warning(f"Subnet sweep capped at {limit} addresses")
+                return hosts
+            address = str(host)
+            if address not in seen:
+                seen.add(address)
+                hosts.append(address)
+    return hosts
@@ -0,0 +1,166 @@
+import json
+import re
+
+# Inbound datagram decoding for the listener.
+#
+# Foreign traffic on the shared multicast group (SSDP and friends) is
+# rejected from its first byte. Govee replies are parsed with orjson or
+# ujson when one is installed. With only the standard library, replies in
+# the devices' compact '{"msg":{"cmd":"<cmd>"' form are dispatched on that
+# prefix and the few fields we use from `scan` and `devStatus` are pulled
+# out with one precompiled regex each instead of a json.loads; anything
+# unusual still gets a full parse. Either way the result is a slot-based
+# record rather than nested dicts.
+
+try:
+    import orjson as _backend
+    BACKEND = 'orjson'
+except ImportError:
+    try:
+        import ujson as _backend
+        BACKEND = 'ujson'
+    except ImportError:
+        _backend = json
+        BACKEND = 'json'
+
+_REGEX_FAST_PATH = BACKEND == 'json'
+
+
+def loads(data):
+    """Parse JSON bytes with the fastest backend available."""
+    if _backend is json:
+        return json.loads(data.decode('utf-8') if isinstance(data, (bytes, bytearray)) else data)
+    return _backend.loads(data)
+
+
+class ScanReply:
+    """`scan` reply: the fields discovery needs."""
+    cmd = 'scan'
+    __slots__ = ('ip', 'device', 'sku')
+
+    def __init__(self, ip, device, sku):
+        self.ip = ip
+        self.device = device
+        self.sku = sku
+
+    def __repr__(self):
+        return f"ScanReply(ip={self.ip}, device={self.device}, sku={self.sku})"
+
+
+class StatusReply:
+    """`devStatus` reply. Fields a light did not report are None."""
+    cmd = 'devStatus'
+    __slots__ = ('onOff', 'brightness', 'colorTemInKelvin', 'r', 'g', 'b')
+
+    def __init__(self, onOff=None, brightness=None, colorTemInKelvin=None, r=None, g=None, b=None):
+        self.onOff = onOff
+        self.brightness = brightness
+        self.colorTemInKelvin = colorTemInKelvin
+        self.r = r
+        self.g = g
+        self.b = b
+
+    def as_dict(self):
+        """The reply in the devStatus `data` layout."""
+        data = {key: getattr(self, key) for key in ('onOff', 'brightness', 'colorTemInKelvin')
+                if getattr(self, key) is not None}
+        if self.r is not None:
+            data['color'] = {'r': self.r, 'g': self.g, 'b': self.b}
+        return data
+
+    def __repr__(self):
+        return (f"StatusReply(onOff={self.onOff}, brightness={self.brightness}, "
+                f"colorTemInKelvin={self.colorTemInKelvin}, color=({self.r}, {self.g}, {self.b}))")
+
+
+class OtherReply:
+    """Any other Govee message, fully parsed."""
+    __slots__ = ('cmd', 'data')
+
+    def __init__(self, cmd, data):
+        self.cmd = cmd
+        self.data = data
+
+    def __repr__(self):
+        return f"OtherReply(cmd={self.cmd}, data={self.data})"
+
+
+_PREFIX = b'{"msg":{"cmd":"'
+_SCAN_PREFIX = _PREFIX + b'scan"'
+_STATUS_PREFIX = _PREFIX + b'devStatus"'
+_SCAN_FIELDS = re.compile(rb'"(ip|device|sku)":"([^"\\]*)"')
+_STATUS_FIELDS = re.compile(rb'"(onOff|brightness|colorTemInKelvin|r|g|b)":(-?\d+)')
+_WHITESPACE = b' \t\r\n'
+_SCAN_CMD = b'"cmd":"scan"'
+
+
+def _scan_fast(data):
+    fields = dict(_SCAN_FIELDS.findall(data, len(_SCAN_PREFIX)))
+    device = fields.get(b'device')
+    if device is None:
+        return None
+    ip = fields.get(b'ip')
+    sku = fields.get(b'sku')
+    return ScanReply(ip.decode('ascii', 'replace') if ip else None,
+                     device.decode('ascii', 'replace'),
+                     sku.decode('ascii', 'replace') if sku else 'unknown')
+
+
+def _int(value):
+    return None if value is None else int(value)
+
+
+def _status_fast(data):
+    fields = dict(_STATUS_FIELDS.findall(data, len(_STATUS_PREFIX)))
+    onOff = fields.get(b'onOff')
+    if onOff is None:
+        return None
+    return StatusReply(int(onOff), _int(fields.get(b'brightness')), _int(fields.get(b'colorTemInKelvin')),
+                       _int(fields.get(b'r')), _int(fields.get(b'g')), _int(fields.get(b'b')))
+
+
+def _from_message(message):
+    msg = message.get('msg') if isinstance(message, dict) else None
+    if not isinstance(msg, dict):
+        return None
+    cmd = msg.get('cmd', '')
+    data = msg.get('data') or {}
+    if cmd == 'scan' and isinstance(data, dict):
+        return ScanReply(data.get('ip'), data.get('device', 'unknown'), data.get('sku', 'unknown'))
+    if cmd == 'devStatus' and isinstance(data, dict):
+        color = data.get('color') or {}
+        return StatusReply(data.get('onOff'), data.get('brightness'), data.get('colorTemInKelvin'),
+                           color.get('r'), color.get('g'), color.get('b'))
+    return OtherReply(cmd, data)
+
+
+def is_foreign(data):
+    """True for datagrams that cannot be a Govee JSON message (SSDP etc.)."""
+    return data.lstrip(_WHITESPACE)[:1] != b'{'
+
+
+def is_scan(data):
+    """True for `scan` replies (cheap byte search, no parse)."""
+    return _SCAN_CMD in data
+
+
+def decode(data):
+    """Decode a datagram into a ScanReply, StatusReply or OtherReply.
+
+    Returns None for foreign or malformed datagrams.
+    """
+    if _REGEX_FAST_PATH:
+        if data.startswith(_STATUS_PREFIX):
+            reply = _status_fast(data)
+            if reply is not None:
+                return reply
+        elif data.startswith(_SCAN_PREFIX):
+            reply = _scan_fast(data)
+            if reply is not None:
+                return reply
+    if is_foreign(data):
+        return None
+    try:
+        return _from_message(loads(data))
+    except (ValueError, UnicodeDecodeError):
+        return None
@@ -0,0 +1,147 @@
+import collections
+import logging
+import threading
+import time
+import udi_interface
+
+LOGGER = udi_interface.LOGGER
+
+
+class PacketLog:
+    """Cheap logging for the per-packet paths.
+
+    `debug()` takes %-style arguments and formats nothing unless the message
+    will actually be written: the logger must be at DEBUG, the device must be
+    due under 1-in-`sample` sampling, and a shared token bucket (`rate`
+    messages/second, `burst` deep) must have room. Suppressed messages are
+    counted and reported with the next one that gets through. Code that
+    logs several lines about one packet decides sampling once with
+    `sampled(ip)` and passes the result to each `debug()` call, so a
+    sampled packet is logged in full and the rest not at all.
+
+    `record()` keeps the raw bytes of the last `history` packets per device
+    in a ring buffer; nothing is decoded until `dump()` is called.
+
+    Usage:
+      PACKETS.record('rx', ip, data)
+      PACKETS.debug(ip, "Found device at %s: %s", ip, response)
+      logged = PACKETS.sampled(ip)
+      PACKETS.debug(ip, "Updating status for %s", ip, sampled=logged)
+      PACKETS.dump('192.168.1.50')
+    """
+
+    def __init__(self, logger=LOGGER, sample: int = 1, rate: float = 20.0, burst: int = 50,
+                 history: int = 16, max_devices: int = 4096):
+        self.logger = logger
+        self.sample = max(1, sample)
+        self.rate = rate
+        self.burst = burst
+        self.history = history
+        self.max_devices = max_devices
+
+        self._rings = {}
+        self._seen = {}
+        self._tokens = float(burst)
+        self._refilled = time.monotonic()
+        self._suppressed = 0
+        self._lock = threading.Lock()
+
+    def configure(self, sample=None, rate=None, burst=None, history=None):
+        with self._lock:
+            if sample is not None:
+                self.sample = max(1, int(sample))
+            if rate is not None:
+                self.rate = float(rate)
+            if burst is not None:
+                self.burst = int(burst)
+                self._tokens = min(self._tokens, self.burst)
+            if history is not None and int(history) != self.history:
+                self.history = int(history)
+                self._rings = {ip: collections.deque(ring, maxlen=self.history or None)
+                               for ip, ring in self._rings.items()} if self.history else {}
+
+    def record(self, direction, ip, data):
+        """Remember a raw datagram (bytes) sent to or received from `ip`."""
+        if not self.history:
+            return
+        ring = self._rings.get(ip)
+        if ring is None:
+            if len(self._rings) >= self.max_devices:
+                return
+            ring = self._rings.setdefault(ip, collections.deque(maxlen=self.history))
+        ring.append((time.time(), direction, data))
+
+    def sampled(self, ip):
+        """True if the current packet from `ip` is due under 1-in-`sample`
+        sampling (and debug logging is on). Counts one packet."""
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return False
+        if self.sample > 1 and ip is not None:
+            count = self._seen.get(ip, 0)
+            self._seen[ip] = count + 1
+            if count % self.sample:
+                return False
+        return True
+
+    def enabled_for(self, ip=None, sampled=None):
+        """True if a debug message about `ip` would be written right now.
+
+        `sampled` is a decision already taken with `sampled()` for this
+        packet; without it each call counts as a packet of its own.
+        """
+        if sampled is None:
+            sampled = self.sampled(ip)
+        if not sampled:
+            return False
+        return self._take()
+
+    def _take(self):
+        with self._lock:
+            if self.rate > 0:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+                self._refilled = now
+                if self._tokens < 1:
+                    self._suppressed += 1
+                    return False
+                self._tokens -= 1
+            suppressed, self._suppressed = self._suppressed, 0
+        if suppressed:
+            self.logger.debug("(%d hot-path log messages suppressed)", suppressed)
+        return True
+
+    def debug(self, ip, msg, *args, sampled=None):
+        if self.enabled_for(ip, sampled):
+            self.logger.debug(msg, *args)
+
+    def packets(self, ip):
+        ring = self._rings.get(ip)
+        return list(ring) if ring else []
+
+    def dump(self, ip=None):
+        """Write the buffered packets (all devices, or just `ip`) to the log at INFO."""
+        ips = [ip] if ip is not None else sorted(self._rings)
+        lines = 0
+        for address in ips:
+            for stamp, direction, data in self.packets(address):
+                text = data.decode('utf-8', 'replace') if isinstance(data, (bytes, bytearray, memoryview)) else str(data)
+                clock = time.strftime('%H:%M:%S', time.localtime(stamp))
+                self.logger.info("%s.%03d %s %s %s", clock, int(stamp * 1000) % 1000, direction, address, text)
+                lines += 1
+        return lines
+
+    def stats(self):
+        return {
+            'devices': len(self._rings),
+            'buffered': sum(len(ring) for ring in list(self._rings.values())),
+            'suppressed': self._suppressed,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._rings.clear()
+            self._seen.clear()
+            self._suppressed = 0
+
+
+PACKETS = PacketLog()
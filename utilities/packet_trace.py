@@ -0,0 +1,157 @@
+import socket
+import struct
+import threading
+import time
+import udi_interface
+
+LOGGER = udi_interface.LOGGER
+
+# Trace file layout (little endian):
+#   header: b'GVTR', version (B), wall-clock start time (d)
+#   record: offset since start in seconds (d), direction (B), IPv4 (4s),
+#           port (H), length (H), then `length` bytes of datagram
+MAGIC = b'GVTR'
+VERSION = 1
+RX = 0
+TX = 1
+_HEADER = struct.Struct('<4sBd')
+_RECORD = struct.Struct('<dB4sHH')
+
+
+class PacketTrace:
+    """Records inbound and outbound datagrams to a binary trace file.
+
+    Hot paths check `TRACE.active` and call `record()`, which only appends
+    a tuple to an in-memory list; a background thread packs and writes the
+    list every `flush_interval` seconds. Read a trace back with
+    `read_trace()` (see tools/replay_trace.py).
+
+    Usage:
+      TRACE.start('/tmp/govee.trace')
+      if TRACE.active:
+          TRACE.record(RX, addr, data)
+      TRACE.stop()
+    """
+
+    def __init__(self, flush_interval: float = 0.5):
+        self.flush_interval = flush_interval
+        self.active = False
+        self.path = None
+        self._file = None
+        self._buffer = []
+        self._started = 0.0
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+        self.records = 0
+        self.bytes = 0
+
+    def start(self, path):
+        with self._lock:
+            if self.active and path == self.path:
+                return
+        self.stop()
+        with self._lock:
+            self._file = open(path, 'wb')
+            self._started = time.monotonic()
+            self._file.write(_HEADER.pack(MAGIC, VERSION, time.time()))
+            self.path = path
+            self.records = 0
+            self.bytes = 0
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='GoveeTrace')
+            self._thread.daemon = True
+            self._thread.start()
+            self.active = True
+        LOGGER.info(f"Packet trace capture started: {path}")
+
+    def record(self, direction, addr, data):
+        self._buffer.append((time.monotonic(), direction, addr, data))
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self._flush()
+        self._flush()
+
+    def _flush(self):
+        buffer, self._buffer = self._buffer, []
+        if not buffer or self._file is None:
+            return
+        started = self._started
+        pack = _RECORD.pack
+        chunks = []
+        for stamp, direction, addr, data in buffer:
+            try:
+                ip = socket.inet_aton(addr[0])
+            except OSError:
+                ip = b'\0\0\0\0'
+            data = bytes(data[:0xFFFF])
+            chunks.append(pack(stamp - started, direction, ip, addr[1] & 0xFFFF, len(data)))
+            chunks.append(data)
+        blob = b''.join(chunks)
+        try:
+            self._file.write(blob)
+        except (OSError, ValueError) as e:
+            LOGGER.error(f"Packet trace write failed: {e}")
+            return
+        self.records += len(buffer)
+        self.bytes += len(blob)
+
+    def stop(self):
+        with self._lock:
+            if not self.active:
+                return
+            self.active = False
+            self._stop.set()
+            thread, self._thread = self._thread, None
+        if thread:
+            thread.join(timeout=5)
+        with self._lock:
+            try:
+                self._file.close()
+            except Exception:
+                pass
+            self._file = None
+        LOGGER.info(f"Packet trace capture stopped: {self.records} packets, {self.bytes} bytes in {self.path}")
+
+    def stats(self):
+        return {
+            'active': self.active,
+            'path': self.path,
+            'records': self.records,
+            'bytes': self.bytes,
+        }
+
+
+def read_trace(path):
+    """Yield (offset, direction, (ip, port), data) for every record in a trace.
+
+    Raises ValueError for a file that is not a trace.
+    """
+    with open(path, 'rb') as f:
+        header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise ValueError(f"{path} is not a packet trace")
+        magic, version, _ = _HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} packet trace")
+        size = _RECORD.size
+        while True:
+            head = f.read(size)
+            if len(head) < size:
+                return
+            offset, direction, ip, port, length = _RECORD.unpack(head)
+            data = f.read(length)
+            if len(data) < length:
+                return
+            yield offset, direction, (socket.inet_ntoa(ip), port), data
+
+
+def trace_started(path):
+    """Wall-clock time at which a trace was started."""
+    with open(path, 'rb') as f:
+        return _HEADER.unpack(f.read(_HEADER.size))[2]
+
+
+TRACE = PacketTrace()
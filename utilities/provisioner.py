@@ -0,0 +1,84 @@
+import threading
+import time
+import udi_interface
+
+LOGGER = udi_interface.LOGGER
+
+
+class NodeProvisioner:
+    """Collects newly discovered devices and hands them over in batches.
+
+    Scan replies only `stage()` a device, which is cheap and safe on the
+    listener thread. Staged devices are handed to `add_fn(batch)` as one
+    list `delay` seconds after the first of them arrived, as soon as
+    `batch_size` are waiting, or when `flush()` is called (e.g. when the scan
+    window closes). A device that replies again while staged just updates
+    its entry.
+
+    Usage:
+      provisioner = NodeProvisioner(add_fn, wheel, batch_size=50)
+      provisioner.stage('d0c9...', deviceId='D0:C9:...', ip='192.168.1.50', sku='H6008')
+      provisioner.flush()
+    """
+
+    def __init__(self, add_fn, wheel, batch_size: int = 50, delay: float = 0.25):
+        self._add = add_fn
+        self.wheel = wheel
+        self.batch_size = batch_size
+        self.delay = delay
+        self._pending = {}
+        self._timer = None
+        self._lock = threading.Lock()
+
+        self.staged = 0
+        self.batches = 0
+        self.provisioned = 0
+
+    def stage(self, address, **info):
+        with self._lock:
+            if address not in self._pending:
+                self.staged += 1
+            info['address'] = address
+            self._pending[address] = info
+            if len(self._pending) >= self.batch_size:
+                batch = self._take()
+            else:
+                if self._timer is None:
+                    self._timer = self.wheel.schedule(self.delay, self.flush)
+                return
+        self._hand_over(batch)
+
+    def is_staged(self, address):
+        return address in self._pending
+
+    def flush(self):
+        with self._lock:
+            batch = self._take()
+        self._hand_over(batch)
+
+    def _take(self):
+        self.wheel.cancel(self._timer)
+        self._timer = None
+        batch, self._pending = list(self._pending.values()), {}
+        return batch
+
+    def _hand_over(self, batch):
+        if not batch:
+            return
+        self.batches += 1
+        self.provisioned += len(batch)
+        started = time.perf_counter()
+        try:
+            self._add(batch)
+        except Exception as e:
+            LOGGER.error(f"Provisioning {len(batch)} devices failed: {e}")
+            return
+        LOGGER.debug(f"Handed over {len(batch)} new devices in {(time.perf_counter() - started) * 1000:.1f}ms")
+
+    def stats(self):
+        return {
+            'staged': self.staged,
+            'pending': len(self._pending),
+            'batches': self.batches,
+            'provisioned': self.provisioned,
+        }
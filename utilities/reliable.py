@@ -0,0 +1,199 @@
+import random
+import threading
+import time
+from collections import deque
+import udi_interface
+
+from . import govee_codec
+
+LOGGER = udi_interface.LOGGER
+
+
+class _Delivery:
+    __slots__ = ('ip', 'field', 'expected', 'payload', 'attempts', 'first_sent', 'timer')
+
+    def __init__(self, ip, field, expected, payload, now):
+        self.ip = ip
+        self.field = field
+        self.expected = expected
+        self.payload = payload
+        self.attempts = 1
+        self.first_sent = now
+        self.timer = None
+
+
+def _percentile(ordered, pct):
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class ReliableDelivery:
+    """Confirms commands by reading the state back and retries lost ones.
+
+    After a command is sent, a unicast `devStatus` goes to the light and the
+    reply (delivered by the shared listener to `on_status`) is compared with
+    the state the command should have produced. If it does not match before
+    the deadline, the command is re-sent after a jittered exponential backoff,
+    up to `max_retries` times. A newer command for the same field replaces
+    the one being tracked.
+
+    With `dispatch(ip, fn, *args)` (e.g. CommandDispatcher.submit) probes
+    and retries are queued behind other work for the light instead of being
+    sent from the wheel thread, and a retry that has been superseded by the
+    time its turn comes is dropped. With `allow(ip)` (the circuit breaker)
+    nothing is sent to an unreachable light; its pending commands fail at
+    once.
+
+    Usage:
+      reliable = ReliableDelivery(send_fn, wheel, dispatch=dispatcher.submit, allow=liveness.allow)
+      reliable.track('192.168.1.50', payload, {'onOff': 1})
+      reliable.on_status('192.168.1.50', status_data)
+      reliable.latency('192.168.1.50')
+    """
+
+    # Lights report color temperature rounded to their own steps
+    TOLERANCE = {'colorTemInKelvin': 100}
+
+    def __init__(self, send_fn, wheel, confirm_delay: float = 0.3, reply_timeout: float = 1.0,
+                 max_retries: int = 3, backoff: float = 0.25, history: int = 200,
+                 dispatch=None, allow=None):
+        self._send = send_fn
+        self._dispatch = dispatch
+        self._allow = allow
+        self.wheel = wheel
+        self.confirm_delay = confirm_delay
+        self.reply_timeout = reply_timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.history = history
+
+        self._pending = {}
+        self._latency = {}
+        self._lock = threading.Lock()
+
+        self.confirmed = 0
+        self.retried = 0
+        self.failed = 0
+
+    def track(self, ip, payload, expect: dict):
+        """Start confirming a command that was just sent to `ip`."""
+        now = time.monotonic()
+        with self._lock:
+            for field, value in expect.items():
+                previous = self._pending.pop((ip, field), None)
+                if previous is not None:
+                    self.wheel.cancel(previous.timer)
+                delivery = _Delivery(ip, field, value, payload, now)
+                self._pending[(ip, field)] = delivery
+                delivery.timer = self.wheel.schedule(self.confirm_delay, self._probe, delivery)
+
+    def _matches(self, delivery, data):
+        actual = data.get(delivery.field)
+        if actual is None:
+            return False
+        tolerance = self.TOLERANCE.get(delivery.field, 0)
+        try:
+            return abs(int(actual) - int(delivery.expected)) <= tolerance
+        except (TypeError, ValueError):
+            return actual == delivery.expected
+
+    def on_status(self, ip, data):
+        """Feed every devStatus reply from `ip` here."""
+        now = time.monotonic()
+        with self._lock:
+            for field in tuple(data):
+                delivery = self._pending.get((ip, field))
+                if delivery is None or not self._matches(delivery, data):
+                    continue
+                del self._pending[(ip, field)]
+                self.wheel.cancel(delivery.timer)
+                self.confirmed += 1
+                samples = self._latency.get(ip)
+                if samples is None:
+                    samples = self._latency[ip] = deque(maxlen=self.history)
+                samples.append(now - delivery.first_sent)
+
+    def _probe(self, delivery):
+        with self._lock:
+            if self._pending.get((delivery.ip, delivery.field)) is not delivery:
+                return
+            if not self._allowed_locked(delivery):
+                return
+            delivery.timer = self.wheel.schedule(self.reply_timeout, self._expire, delivery)
+        self._queue(delivery.ip, self._transmit, delivery.ip, govee_codec.DEV_STATUS)
+
+    def _expire(self, delivery):
+        with self._lock:
+            if self._pending.get((delivery.ip, delivery.field)) is not delivery:
+                return
+            if delivery.attempts > self.max_retries:
+                del self._pending[(delivery.ip, delivery.field)]
+                self.failed += 1
+                LOGGER.warning(f"No confirmation of {delivery.field}={delivery.expected} from {delivery.ip} after {delivery.attempts} attempts")
+                return
+            delay = self.backoff * (2 ** (delivery.attempts - 1)) * random.uniform(0.5, 1.5)
+            delivery.attempts += 1
+            self.retried += 1
+            delivery.timer = self.wheel.schedule(delay, self._resend, delivery)
+
+    def _resend(self, delivery):
+        with self._lock:
+            if self._pending.get((delivery.ip, delivery.field)) is not delivery:
+                return
+            if not self._allowed_locked(delivery):
+                return
+            delivery.timer = self.wheel.schedule(self.confirm_delay, self._probe, delivery)
+        self._queue(delivery.ip, self._retry, delivery)
+
+    def _retry(self, delivery):
+        with self._lock:
+            if self._pending.get((delivery.ip, delivery.field)) is not delivery:
+                # A newer command for this field was sent while we were queued
+                return
+        LOGGER.debug(f"Retrying {delivery.field} to {delivery.ip} (attempt {delivery.attempts})")
+        self._transmit(delivery.ip, delivery.payload)
+
+    def _allowed_locked(self, delivery):
+        if self._allow is None or self._allow(delivery.ip):
+            return True
+        del self._pending[(delivery.ip, delivery.field)]
+        self.failed += 1
+        LOGGER.debug(f"Not confirming {delivery.field} on {delivery.ip}: device is unreachable")
+        return False
+
+    def _queue(self, ip, fn, *args):
+        if self._dispatch is None:
+            fn(*args)
+        elif not self._dispatch(ip, fn, *args):
+            LOGGER.debug(f"Dispatch queue full; reliable send to {ip} skipped")
+
+    def _transmit(self, ip, payload):
+        try:
+            self._send(ip, payload)
+        except Exception as e:
+            LOGGER.debug(f"Reliable send to {ip} failed: {e}")
+
+    def latency(self, ip=None):
+        """Delivery latency percentiles (seconds) for one device, or all devices."""
+        with self._lock:
+            if ip is None:
+                samples = [s for d in self._latency.values() for s in d]
+            else:
+                samples = list(self._latency.get(ip, ()))
+        samples.sort()
+        return {
+            'count': len(samples),
+            'p50': _percentile(samples, 50),
+            'p90': _percentile(samples, 90),
+            'p99': _percentile(samples, 99),
+        }
+
+    def stats(self):
+        return {
+            'pending': len(self._pending),
+            'confirmed': self.confirmed,
+            'retried': self.retried,
+            'failed': self.failed,
+        }
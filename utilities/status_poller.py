@@ -0,0 +1,193 @@
+import heapq
+import itertools
+import threading
+import time
+import udi_interface
+
+from . import govee_codec
+
+LOGGER = udi_interface.LOGGER
+
+
+class _PollState:
+    __slots__ = ('ip', 'interval', 'due', 'awaiting', 'misses', 'state')
+
+    def __init__(self, ip, interval, due):
+        self.ip = ip
+        self.interval = interval
+        self.due = due
+        self.awaiting = False
+        self.misses = 0
+        self.state = None
+
+
+class StatusPoller:
+    """Unicast `devStatus` polling with a per-device adaptive interval.
+
+    - Devices that were just commanded or whose state changed are polled
+      every `active_interval` seconds.
+    - Stable devices back off by 1.5x per unchanged reply up to `max_interval`.
+    - Devices that miss a reply back off exponentially up to `max_backoff`.
+
+    Sends are paced by a token bucket so the fleet never exceeds `max_rate`
+    packets/second. Due times live in a heap, so each tick only touches the
+    devices that are actually due.
+
+    `on_miss(ip)`, if given, is called for every poll that goes unanswered.
+
+    Usage:
+      poller = StatusPoller(send_fn, wheel, max_rate=20)
+      poller.start()
+      poller.add('192.168.1.50')
+      poller.note_reply('192.168.1.50', (1, 80, 2700))
+    """
+
+    def __init__(self, send_fn, wheel, active_interval: float = 5.0, min_interval: float = 30.0,
+                 max_interval: float = 300.0, max_backoff: float = 900.0, reply_timeout: float = 3.0,
+                 max_rate: float = 20.0, tick: float = 0.25, on_miss=None):
+        self._send = send_fn
+        self.on_miss = on_miss
+        self.wheel = wheel
+        self.active_interval = active_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_backoff = max_backoff
+        self.reply_timeout = reply_timeout
+        self.max_rate = max_rate
+        self.tick = tick
+
+        self._devices = {}
+        self._heap = []
+        self._seq = itertools.count()
+        self._tokens = max_rate
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+        self._timer = None
+        self._running = False
+
+        self.sent = 0
+        self.missed = 0
+
+    def start(self):
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            self._timer = self.wheel.schedule(self.tick, self._tick)
+
+    def stop(self):
+        with self._lock:
+            self._running = False
+            self.wheel.cancel(self._timer)
+            self._timer = None
+
+    def _push(self, state, due):
+        state.due = due
+        heapq.heappush(self._heap, (due, next(self._seq), state))
+
+    def add(self, ip, delay: float = 0.0):
+        if not ip:
+            return
+        with self._lock:
+            if ip in self._devices:
+                return
+            state = _PollState(ip, self.min_interval, 0)
+            self._devices[ip] = state
+            self._push(state, time.monotonic() + delay)
+
+    def remove(self, ip):
+        with self._lock:
+            # Heap entries for a removed state are skipped when popped
+            self._devices.pop(ip, None)
+
+    def move(self, old_ip, new_ip):
+        self.remove(old_ip)
+        self.add(new_ip)
+
+    def note_command(self, ip):
+        """A command was just sent; poll soon to pick up the new state."""
+        with self._lock:
+            state = self._devices.get(ip)
+            if state is None:
+                return
+            state.interval = self.active_interval
+            due = time.monotonic() + self.active_interval
+            if not state.awaiting and due < state.due:
+                self._push(state, due)
+
+    def note_reply(self, ip, values=None):
+        """A devStatus reply arrived from `ip` (polled or not)."""
+        with self._lock:
+            state = self._devices.get(ip)
+            if state is None:
+                return
+            changed = values is not None and state.state is not None and values != state.state
+            if values is not None:
+                state.state = values
+            state.awaiting = False
+            state.misses = 0
+            if changed:
+                state.interval = self.active_interval
+            else:
+                state.interval = min(max(state.interval * 1.5, self.min_interval), self.max_interval)
+            self._push(state, time.monotonic() + state.interval)
+
+    def _tick(self):
+        sends = []
+        misses = []
+        deferred = []
+        with self._lock:
+            if not self._running:
+                return
+            now = time.monotonic()
+            self._tokens = min(self.max_rate, self._tokens + (now - self._last_refill) * self.max_rate)
+            self._last_refill = now
+
+            heap = self._heap
+            while heap and heap[0][0] <= now:
+                due, _, state = heap[0]
+                if self._devices.get(state.ip) is not state or state.due != due:
+                    heapq.heappop(heap)
+                    continue
+                if state.awaiting:
+                    heapq.heappop(heap)
+                    state.awaiting = False
+                    state.misses += 1
+                    self.missed += 1
+                    misses.append(state.ip)
+                    state.interval = min(self.min_interval * (2 ** state.misses), self.max_backoff)
+                    self._push(state, now + state.interval)
+                    continue
+                heapq.heappop(heap)
+                if self._tokens < 1:
+                    # Over the rate ceiling; keep its place for the next tick
+                    deferred.append((due, state))
+                    continue
+                self._tokens -= 1
+                state.awaiting = True
+                self._push(state, now + self.reply_timeout)
+                sends.append(state.ip)
+            for due, state in deferred:
+                heapq.heappush(heap, (due, next(self._seq), state))
+            self._timer = self.wheel.schedule(self.tick, self._tick)
+
+        if self.on_miss is not None:
+            for ip in misses:
+                self.on_miss(ip)
+
+        for ip in sends:
+            self.sent += 1
+            try:
+                self._send(ip, govee_codec.DEV_STATUS)
+            except Exception as e:
+                LOGGER.debug(f"Status poll to {ip} failed: {e}")
+
+    def stats(self):
+        with self._lock:
+            backed_off = sum(1 for s in self._devices.values() if s.misses)
+            return {
+                'devices': len(self._devices),
+                'sent': self.sent,
+                'missed': self.missed,
+                'unresponsive': backed_off,
+            }
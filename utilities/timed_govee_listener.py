@@ -1,52 +1,85 @@
 import threading
 import time
 from .govee_listener import GoveeListener
+from .timer_wheel import TimerWheel
+from .metrics import METRICS
 
 class TimedGoveeListener:
     """
-    Wraps GoveeListener with a timeout that can be extended.
-    If timeout expires, listener stops itself.
+    Keeps a single GoveeListener bound for the life of the node server and
+    tracks timed listen windows (scan/query) on a shared TimerWheel.
+    Expiring a window only closes the window; the socket stays bound, so
+    replies arriving between windows are still delivered.
     """
-    def __init__(self, multicastGroup='239.255.255.250', receivePort=4002, timeout=5, callback=None):
-        self.listener = GoveeListener(multicastGroup, receivePort)
+    def __init__(self, multicastGroup='239.255.255.250', receivePort=4002, timeout=5, callback=None, wheel=None, decoder=None):
+        self.listener = GoveeListener(multicastGroup, receivePort, decoder=decoder)
         self.timeout = timeout
         self.callback = callback
-        self._timer_thread = None
+        self.wheel = wheel or TimerWheel()
+        self._own_wheel = wheel is None
         self._timer_lock = threading.Lock()
+        self._timer = None
         self._active = False
         self._expire_time = None
+        self._on_close = []
 
     def start(self):
+        """Bind the listener once; later calls are no-ops."""
+        if self.listener.running:
+            return
+        if self._own_wheel:
+            self.wheel.start()
         self.listener.start(self.callback)
-        self._active = True
-        self.extend(self.timeout)
-        self._timer_thread = threading.Thread(target=self._timer_loop)
-        self._timer_thread.daemon = True
-        self._timer_thread.start()
+
+    def open(self, seconds=None, on_close=None):
+        """Open a listen window, or extend the one already open."""
+        self.start()
+        if on_close is not None:
+            with self._timer_lock:
+                self._on_close.append(on_close)
+        self.extend(self.timeout if seconds is None else seconds)
 
     def extend(self, seconds):
         with self._timer_lock:
+            if METRICS.enabled and not self._active:
+                METRICS.inc('listen_windows', 'opened')
             now = time.time()
             if self._expire_time is None or self._expire_time < now:
                 self._expire_time = now + seconds
             else:
                 self._expire_time += seconds
+            self._active = True
+            self.wheel.cancel(self._timer)
+            self._timer = self.wheel.schedule(self._expire_time - now, self._expire)
 
-    def _timer_loop(self):
-        while self._active:
-            with self._timer_lock:
-                expire = self._expire_time
-            if expire is not None and time.time() >= expire:
-                self.stop()
-                break
-            time.sleep(0.5)
+    def _expire(self):
+        with self._timer_lock:
+            now = time.time()
+            if self._expire_time is not None and now < self._expire_time:
+                # Extended after this timer was taken off the wheel, or fired
+                # a little early; wait out the rest of the window
+                self._timer = self.wheel.schedule(self._expire_time - now, self._expire)
+                return
+            self._active = False
+            self._expire_time = None
+            self._timer = None
+            on_close, self._on_close = self._on_close, []
+            if METRICS.enabled:
+                METRICS.inc('listen_windows', 'closed')
+        for fn in on_close:
+            fn()
 
     def stop(self):
-        self._active = False
+        with self._timer_lock:
+            self.wheel.cancel(self._timer)
+            self._timer = None
+            self._active = False
+            self._expire_time = None
+            self._on_close = []
         self.listener.stop()
-        self._expire_time = None
+        if self._own_wheel:
+            self.wheel.stop()
 
     @property
     def is_active(self):
         return self._active
-
@@ -0,0 +1,135 @@
+import math
+import threading
+import time
+import udi_interface
+
+LOGGER = udi_interface.LOGGER
+
+
+class Timer:
+    """Handle returned by `TimerWheel.schedule`; pass it to `cancel`."""
+    __slots__ = ('fn', 'args', 'rounds', 'slot', 'cancelled')
+
+    def __init__(self, fn, args, rounds, slot):
+        self.fn = fn
+        self.args = args
+        self.rounds = rounds
+        self.slot = slot
+        self.cancelled = False
+
+
+class TimerWheel:
+    """Hashed timer wheel driven by a single thread.
+
+    Every timed job in the node server (listen windows, retries, flushes)
+    shares this one thread instead of spawning a sleeper per job. Callbacks
+    run on the wheel thread and must not block.
+
+    Usage:
+      wheel = TimerWheel(tick=0.1)
+      wheel.start()
+      timer = wheel.schedule(5, callback, arg)
+      wheel.cancel(timer)
+      wheel.stop()
+    """
+
+    def __init__(self, tick: float = 0.1, slots: int = 512):
+        self.tick = tick
+        self.slots = [[] for _ in range(slots)]
+        self._cursor = 0
+        self._pending = 0
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+        self._next_tick = None
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._next_tick = time.monotonic() + self.tick
+        self._thread = threading.Thread(target=self._run, name='TimerWheel')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+        self._thread = None
+
+    @property
+    def is_running(self):
+        return self._running
+
+    def schedule(self, delay: float, fn, *args):
+        """Run `fn(*args)` on the wheel thread after `delay` seconds (never
+        earlier, at most about one tick later)."""
+        with self._cond:
+            now = time.monotonic()
+            if self._pending == 0 or self._next_tick is None:
+                # The wheel idles without ticking when empty; resync the clock.
+                self._next_tick = now + self.tick
+            # Slot `cursor + n` fires at `_next_tick + n * tick`: take the first
+            # one at or after the deadline, counting the partial current tick
+            ticks = max(0, math.ceil((now + delay - self._next_tick) / self.tick - 1e-9))
+            rounds, offset = divmod(ticks, len(self.slots))
+            slot = (self._cursor + offset) % len(self.slots)
+            timer = Timer(fn, args, rounds, slot)
+            self.slots[slot].append(timer)
+            self._pending += 1
+            self._cond.notify()
+        return timer
+
+    def cancel(self, timer):
+        if timer is None:
+            return
+        with self._cond:
+            if timer.cancelled:
+                return
+            timer.cancelled = True
+            try:
+                self.slots[timer.slot].remove(timer)
+                self._pending -= 1
+            except ValueError:
+                # Already fired or being fired
+                pass
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and self._pending == 0:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                delay = self._next_tick - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+                self._next_tick += self.tick
+                due = self._advance()
+
+            for timer in due:
+                try:
+                    timer.fn(*timer.args)
+                except Exception as e:
+                    LOGGER.error(f"TimerWheel callback {getattr(timer.fn, '__name__', timer.fn)} failed: {e}", exc_info=True)
+
+    def _advance(self):
+        bucket = self.slots[self._cursor]
+        due = []
+        keep = []
+        for timer in bucket:
+            if timer.rounds > 0:
+                timer.rounds -= 1
+                keep.append(timer)
+            else:
+                timer.cancelled = True
+                due.append(timer)
+        self.slots[self._cursor] = keep
+        self._pending -= len(due)
+        self._cursor = (self._cursor + 1) % len(self.slots)
+        return due